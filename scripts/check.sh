@@ -1 +1,3 @@
 python ./src/utils.py -m ./assets/mazes.json
+python ./src/utils.py -r ./tests/records.json
+python -m pytest -q ./tests
@@ -0,0 +1,182 @@
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, Optional
+
+import display
+import engine
+import loaders
+
+maze_loader: Optional["MazeLoader"] = None
+
+def load_assets(path: str) -> None:
+    """
+    Loads the blocks and the mazes in a worker process, which is done once per process.
+
+    Args:
+        path:   str
+            The path to the JSON file of the mazes.
+    """
+
+    global maze_loader
+    loaders.BlockLoader("./assets/blocks.json").load()
+    maze_loader = loaders.MazeLoader(path)
+    maze_loader.load()
+
+def get_distances(state: "GameState") -> dict[tuple[int, int], int]:
+    """
+    Get the distances from every reachable cell to the exit of the maze,
+    searched by breadth-first search over the cells which are not solid at the start.
+
+    Args:
+        state:  GameState
+            The initial state of the game.
+
+    Returns:
+        dict[tuple[int, int], int]
+            The distances to the exit by the cells.
+    """
+
+    maze = state.maze
+    distances = {maze.end: 0}
+    queue = deque([maze.end])
+    while queue:
+        y, x = queue.popleft()
+        for dy, dx in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+            ny, nx = y + dy, x + dx
+            if (ny, nx) not in distances and maze.check_inrange(ny, nx) and not maze.check_solid(ny, nx):
+                distances[ny, nx] = distances[y, x] + 1
+                queue.append((ny, nx))
+    return distances
+
+def random_policy(state: "GameState", rng: random.Random, distances: dict[tuple[int, int], int]) -> str:
+    """
+    A policy which moves in a random direction.
+    """
+
+    return rng.choice(("up", "down", "left", "right"))
+
+def greedy_policy(state: "GameState", rng: random.Random, distances: dict[tuple[int, int], int]) -> str:
+    """
+    A policy which moves towards the exit along the shortest path, avoiding the cells occupied by the chasers,
+    and moves in a random direction once in ten moves to get out of dead ends.
+    """
+
+    if rng.random() < 0.1:
+        return random_policy(state, rng, distances)
+    player = state.player
+    best_action, best_distance = "stay", distances.get((player.y, player.x), len(distances))
+    for action in ("up", "down", "left", "right"):
+        dy, dx = engine.GameEngine.actions[action]
+        ny, nx = player.y + dy, player.x + dx
+        if state.maze.check_route(ny, nx) and distances.get((ny, nx), len(distances)) < best_distance:
+            best_action, best_distance = action, distances[ny, nx]
+    return best_action
+
+policies: dict[str, Callable[["GameState", random.Random, dict[tuple[int, int], int]], str]] = {
+    "random": random_policy,
+    "greedy": greedy_policy
+}
+
+def play_games(maze_index: int, policy: str, seeds: list[int], max_steps: int) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Plays the games of the maze headlessly in a worker process, one game per seed.
+
+    Args:
+        maze_index: int
+            The index of the maze to be played.
+        policy:     str
+            The name of the policy which chooses the actions.
+        seeds:      list[int]
+            The seeds of the random generators of the games.
+        max_steps:  int
+            The maximum number of actions in a game, the game times out after that.
+
+    Returns:
+        tuple[int, list[dict[str, Any]]]
+            The index of the maze and the records of the games,
+            the status of a game which timed out is "timeout" and its score is 0.
+    """
+
+    game_engine = engine.GameEngine(maze_loader)
+    choose = policies[policy]
+    records = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        state = game_engine.reset(maze_index)
+        distances = get_distances(state)
+        for _ in range(max_steps):
+            game_engine.step(choose(state, rng, distances))
+            if game_engine.status is not None:
+                break
+        record = game_engine.get_record()
+        if record is None:
+            record = {"status": "timeout", "step": state.player.step, "score": 0}
+        records.append(record)
+    return maze_index, records
+
+def run_batch(
+    path: str, maze_indices: list[int], policy: str, seeds: list[int],
+    workers: Optional[int]=None, max_steps: int=1000, chunk: int=50
+) -> Iterator[tuple[int, "Recorder"]]:
+    """
+    Plays the games of the mazes across a pool of processes,
+    and streams the records into a Recorder per maze as the chunks of games finish.
+
+    Args:
+        path:           str
+            The path to the JSON file of the mazes.
+        maze_indices:   list[int]
+            The indices of the mazes to be played.
+        policy:         str
+            The name of the policy which chooses the actions.
+        seeds:          list[int]
+            The seeds of the games, every maze is played once per seed.
+        workers:        int, optional
+            The number of processes (default is None for the number of processors).
+        max_steps:      int, optional
+            The maximum number of actions in a game (default is 1000).
+        chunk:          int, optional
+            The number of games played by a task (default is 50).
+
+    Returns:
+        Iterator[tuple[int, Recorder]]
+            The index of the maze and its Recorder, yielded each time a chunk of its games finishes.
+    """
+
+    recorders = {maze_index: display.Recorder() for maze_index in maze_indices}
+    with ProcessPoolExecutor(workers, initializer=load_assets, initargs=(path,)) as executor:
+        futures = [
+            executor.submit(play_games, maze_index, policy, seeds[start:start + chunk], max_steps)
+            for maze_index in maze_indices for start in range(0, len(seeds), chunk)
+        ]
+        for future in as_completed(futures):
+            maze_index, records = future.result()
+            for record in records:
+                recorders[maze_index].insert_record(record)
+            yield maze_index, recorders[maze_index]
+
+def summarize_batch(recorder: "Recorder") -> dict[str, Any]:
+    """
+    Summarize the records of a maze with the win rate and the distributions of the steps and scores.
+
+    Args:
+        recorder:   Recorder
+            The recorder of the games of the maze.
+
+    Returns:
+        dict[str, Any]
+            The summary of the Recorder, with the number of games, the win rate,
+            and the percentiles of the steps and the scores.
+    """
+
+    summary = recorder.summarize_recodes()
+    games = len(recorder.records)
+    summary["games"] = games
+    summary["win_rate"] = summary["win"] / games if games else 0.0
+    for key in ("step", "score"):
+        values = sorted(record[key] for record in recorder.records)
+        summary[f"{key}_percentiles"] = {
+            f"p{percentile}": values[min(games - 1, games * percentile // 100)] for percentile in (10, 50, 90)
+        } if values else {}
+    return summary
@@ -1,4 +1,7 @@
-import curses
+from typing import Optional
+
+scales: list[tuple[int, int]] = [(2, 4), (1, 2), (1, 1)]
+block_size: Optional[tuple[int, int]] = None
 
 class Block:
     """
@@ -17,12 +20,14 @@ class Block:
             The color of the block, which is an index of the color pair.
         is_solid:   bool
             A boolean value which shows whether the block is solid or not.
+        glyphs: dict[tuple[int, int], tuple[str, ...]]
+            The rows of characters which represent the block at each render scale, built by build_glyphs.
         
     Methods:
         draw(win, y, x)
-            Draws the block on the given window at the given coordinates.
-        transform(y, x)
-            Transforms the block coordinate to window coordinates.
+            Draws the block on the given frame buffer at the given coordinates.
+        get_rows(y, x)
+            Get the rows of characters which represent the block in window coordinates.
     """
 
 
@@ -34,44 +39,108 @@ class Block:
         self.char: str = char
         self.color: int = color
         self.is_solid: bool = is_solid
+        self.glyphs: dict[tuple[int, int], tuple[str, ...]] = {}
         Block.blocks[self.name] = self
     
-    def draw(self, win: curses.window, y: int, x: int) -> None:
+    def draw(self, win: "FrameBuffer", y: int, x: int) -> None:
         """
-        Draws the block on the given window at the given coordinates.
+        Draws the block on the given frame buffer at the given coordinates,
+        the coordinates are relative to the camera of the buffer if it has one.
 
         Args:
-            win:    curses.window
-                The curses window where the block will be drawn.
+            win:    FrameBuffer
+                The frame buffer where the block will be drawn.
             y:      int
                 The y-coordinate where the block will be drawn.
             x:      int
                 The x-coordinate where the block will be drawn.
         """
-        for window_y, window_x in self.transform(y, x):
-            win.addch(window_y, window_x, self.char, curses.color_pair(self.color))
+        camera = win.camera
+        if camera is not None:
+            if not camera.check_visible(y, x):
+                return
+            y, x = y - camera.top, x - camera.left
+        for window_y, window_x, chars in self.get_rows(y, x):
+            win.put(window_y, window_x, chars, self.color)
 
-    def transform(self, y: int, x: int) -> list[tuple[int, int]]:
+    def get_rows(self, y: int, x: int) -> list[tuple[int, int, str]]:
         """
-        Transforms the block coordinate to window coordinates.
+        Get the rows of characters which represent the block in window coordinates.
 
         Args:
             y:  int
                 The y-coordinate of the block
             x:  int
                 The x-coordinate of the block
-        
+
         Returns:
-            list[tuple[int, int]]: A list of tuple representing the window coordinates.
+            list[tuple[int, int, str]]: A list of tuple representing the window coordinates and the characters of each row.
         """
         common_height, common_width = get_block_size()
-        block_height, block_width = self.size
         return [
-            (y * common_height + i + 1, x * common_width + j + 1) 
-            for i in range(block_height) for j in range(block_width)
+            (y * common_height + i + 1, x * common_width + 1, chars)
+            for i, chars in enumerate(self.glyphs[common_height, common_width])
         ]
 
 
+class Layout:
+    """
+    A class to represent the blocks of a maze as a copy-on-write grid.
+
+    The base blocks are shared by every attempt of the same maze and never change,
+    while the changes made by pushing boxes or collecting bonuses are kept in the overlay.
+
+    Attributes:
+        base:       tuple[Block, ...]
+            The immutable blocks of the maze as loaded, in row-major order.
+        overlay:    dict[int, Block]
+            The blocks which differ from the base, stored by their index.
+
+    Methods:
+        fork():
+            Creates a new layout which shares the base and copies the overlay.
+        reset():
+            Discards all the changes and restores the base blocks.
+    """
+
+    def __init__(self, base: tuple["Block", ...], overlay: dict[int, "Block"]=None):
+        self.base: tuple["Block", ...] = base
+        self.overlay: dict[int, "Block"] = {} if overlay is None else overlay
+
+    def __getitem__(self, index: int) -> "Block":
+        if index in self.overlay:
+            return self.overlay[index]
+        return self.base[index]
+
+    def __setitem__(self, index: int, block: "Block") -> None:
+        if self.base[index] is block:
+            self.overlay.pop(index, None)
+        else:
+            self.overlay[index] = block
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def __iter__(self):
+        for index, block in enumerate(self.base):
+            yield self.overlay.get(index, block)
+
+    def fork(self) -> "Layout":
+        """
+        Creates a new layout which shares the base and copies the overlay.
+
+        Returns:
+            Layout: The forked layout, whose changes do not affect this layout.
+        """
+        return Layout(self.base, dict(self.overlay))
+
+    def reset(self) -> None:
+        """
+        Discards all the changes and restores the base blocks.
+        """
+        self.overlay.clear()
+
+
 def get_block(name: str) -> "Block":
     """
     Get the block instance by its name.
@@ -85,17 +154,63 @@ def get_block(name: str) -> "Block":
     """
     return Block.blocks[name]
 
+def build_glyphs() -> None:
+    """
+    Builds the glyph tables of all blocks for each render scale,
+    which should be called once all blocks have been initialized.
+
+    Steps:
+        1. Find the maximum block size, which is the full render scale.
+        2. Keep the compact scales which are smaller than the full one, from the largest to the smallest.
+        3. Shrink every block proportionally for each scale, keeping at least one character.
+        4. Reset the render scale to the full one.
+    """
+    global block_size
+    full_height = max(block.size[0] for block in Block.blocks.values())
+    full_width = max(block.size[1] for block in Block.blocks.values())
+    compact = [(height, width) for height, width in scales if height <= full_height and width <= full_width]
+    scales[:] = sorted({(full_height, full_width), *compact}, reverse=True)
+    for block in Block.blocks.values():
+        block_height, block_width = block.size
+        for height, width in scales:
+            rows = max(1, block_height * height // full_height)
+            chars = block.char * max(1, block_width * width // full_width)
+            block.glyphs[height, width] = (chars,) * rows
+    block_size = scales[0]
+
+def choose_block_size(height: int, width: int, screen_height: int, screen_width: int) -> tuple[int, int]:
+    """
+    Chooses the largest render scale with which the whole maze fits the screen,
+    or the smallest one if the maze does not fit with any of them.
+
+    Args:
+        height: int
+            The height of the maze.
+        width:  int
+            The width of the maze.
+        screen_height:  int
+            The height of the screen.
+        screen_width:   int
+            The width of the screen.
+
+    Returns:
+        tuple[int, int]: The chosen render scale in terms of height and width.
+    """
+    global block_size
+    chosen = scales[-1]
+    for scale in scales:
+        if height * scale[0] + 2 <= screen_height and width * scale[1] + 2 <= screen_width:
+            chosen = scale
+            break
+    block_size = chosen
+    return block_size
+
 def get_block_size() -> tuple[int, int]:
     """
-    Get the maximum block size
+    Get the current render scale, which is the maximum block size unless a compact one is chosen.
 
     Returns:
-        tuple[int, int]: The maximum size in terms of height and width
+        tuple[int, int]: The size of a cell in terms of height and width
     
     """
-    max_size_y = max_size_x = 0
-    for block in Block.blocks.values():
-        max_size_y = max(max_size_y, block.size[0])
-        max_size_x = max(max_size_x, block.size[1])
-    return max_size_y, max_size_x
-
+    return block_size
@@ -1,6 +1,30 @@
 import curses
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
 from typing import Optional, Any
 
+blank_rows: dict[int, str] = {}
+
+def get_blank_row(width: int) -> str:
+    """
+    Get a row of spaces with the given width, which is cached for each width.
+
+    Args:
+        width:  int
+            The number of spaces in the row.
+
+    Returns:
+        str: The row of spaces.
+    """
+    if width not in blank_rows:
+        blank_rows[width] = " " * width
+    return blank_rows[width]
+
 class Text:
     """
     A class to handle the display of texts.
@@ -15,15 +39,14 @@ class Text:
         indent: int, optional
             The number of spaces to indent the text (default is 0).
         variable: bool, optional
-            Whether the text contains variable to be filled in (default is False).
+            Whether the text contains variable to be filled in (default is False),
+            such a text is drawn through a Template compiled from it.
         color: int, optional
             The color pair number to be used for displaying the text (default is 0).
     
     Methods:
-        fillin_variable(fillings):
-            Replace variable in the content with the given fillings.
         draw(win):
-            Draw the text on the given window.
+            Draw the text on the given frame buffer.
 
     """
 
@@ -35,81 +58,658 @@ class Text:
         self.variable: bool = variable
         self.color: int = color
 
-    def fillin_variable(self, fillins: Any) -> None:
+    def draw(self, win: "FrameBuffer") -> None:
         """
-        Replace variable in the content with the given fillings.
-        
+        Draws the text on the given frame buffer
+
+        Args:
+            win:    FrameBuffer
+                The frame buffer where the text will be drawn.
+        """
+
+        height, width = win.getmaxyx()
+        y = self.line
+        x = ((width - len(self.content)) // 2 if self.align else 0) + self.indent
+        win.put(y, x, self.content, self.color)
+
+class Template:
+    """
+    A class to represent a text with a variable compiled for a given width,
+    so it can be rendered with new values repeatedly without measuring the window again.
+
+    Attributes:
+        head: str
+            The content before the variable field.
+        field: str
+            The format specifier of the variable field, such as "%d" or "%5d".
+        tail: str
+            The content after the variable field.
+        line: int
+            The line number where the text should be displayed.
+        color: int
+            The color pair number to be used for displaying the text.
+        size: int
+            The width of the variable field, 0 if the field has no fixed width.
+        space: int
+            The width left for the variable field to be centered in, None if the text is not centered.
+        x: int
+            The x-coordinate of the text when the rendered field is exactly size characters wide.
+        indent: int
+            The number of spaces to indent the text.
+
+    Methods:
+        render(value):
+            Renders the content with the given value.
+        draw(win, value):
+            Draws the content with the given value on a frame buffer with the compiled width.
+    """
+
+    pattern: re.Pattern = re.compile(r"%[-+ #0]*(\d*)(?:\.\d+)?[diouxXeEfFgGcrsa]")
+
+    def __init__(self, text: Text, width: int):
+        match = self.pattern.search(text.content)
+        start, end = (match.start(), match.end()) if match else (len(text.content), len(text.content))
+        self.head: str = text.content[:start].replace("%%", "%")
+        self.field: str = text.content[start:end] or "%.0s"
+        self.tail: str = text.content[end:].replace("%%", "%")
+        self.line: int = text.line
+        self.color: int = text.color
+        self.indent: int = text.indent
+        self.size: int = int(match.group(1)) if match and match.group(1) else 0
+        self.space: Optional[int] = width - len(self.head) - len(self.tail) if text.align else None
+        self.x: int = ((self.space - self.size) // 2 if text.align else 0) + self.indent
+
+    def render(self, value: Any) -> str:
+        """
+        Renders the content with the given value.
+
+        Args:
+            value:  Any
+                The value to be filled in the variable field.
+
+        Returns:
+            str: The content with the value filled in.
+        """
+
+        return self.head + self.field % value + self.tail
+
+    def draw(self, win: "FrameBuffer", value: Any) -> None:
+        """
+        Draws the content with the given value on a frame buffer with the compiled width.
+
+        Args:
+            win:    FrameBuffer
+                The frame buffer where the text will be drawn.
+            value:  Any
+                The value to be filled in the variable field.
+        """
+
+        field = self.field % value
+        x = self.x
+        if self.space is not None and len(field) != self.size:
+            x = (self.space - len(field)) // 2 + self.indent
+        win.put(self.line, x, self.head + field + self.tail, self.color)
+
+class Menu:
+    """
+    A class to represent a menu compiled into a static frame and variable slots,
+    so a redraw only patches the slots whose values have changed.
+
+    Attributes:
+        height: int
+            The height of the menu.
+        width: int
+            The width of the menu.
+        texts: list[Text]
+            The texts without variables, which make up the static frame.
+        slots: list[Text]
+            The texts with variables, in the order of the variables to be filled in.
+        templates: list[Template]
+            The templates compiled from the slots for the width of the frame.
+        frame: list[list[tuple[str, int]]] or None
+            The cached cells of the static frame, initialized as None.
+        values: list[Any]
+            The values drawn in each slot, None if the slot has not been drawn on the current frame.
+
+    Methods:
+        draw_frame(win):
+            Draws the static frame on the given frame buffer.
+        draw_slots(win, variables):
+            Draws the slots whose values have changed on the given frame buffer.
+    """
+
+    def __init__(self, height: int, width: int, texts: list[Text]):
+        self.height: int = height
+        self.width: int = width
+        self.texts: list[Text] = [text for text in texts if not text.variable]
+        self.slots: list[Text] = [text for text in texts if text.variable]
+        self.templates: list[Template] = []
+        self.frame: Optional[list[list[tuple[str, int]]]] = None
+        self.values: list[Any] = [None] * len(self.slots)
+
+    def draw_frame(self, win: "FrameBuffer") -> None:
+        """
+        Draws the static frame on the given frame buffer,
+        the frame and the templates are built once and reused as long as the buffer has the same size.
+
+        Args:
+            win:    FrameBuffer
+                The frame buffer where the menu will be drawn.
+        """
+
+        if self.frame is None or (len(self.frame), len(self.frame[0])) != win.getmaxyx():
+            win.erase()
+            for text in self.texts:
+                text.draw(win)
+            self.frame = win.snapshot()
+            self.templates = [Template(slot, win.getmaxyx()[1]) for slot in self.slots]
+        else:
+            win.paste(self.frame)
+        self.values = [None] * len(self.slots)
+
+    def draw_slots(self, win: "FrameBuffer", variables: list[Any]) -> None:
+        """
+        Draws the slots whose values have changed on the given frame buffer,
+        the lines of these slots are restored from the frame before they are drawn.
+
+        Args:
+            win:        FrameBuffer
+                The frame buffer where the frame of the menu has been drawn.
+            variables:  list[Any]
+                The values to be filled in the slots.
+        """
+
+        lines = {template.line for template, value, variable in zip(self.templates, self.values, variables) if value != variable}
+        if not lines:
+            return
+        win.paste(self.frame, lines)
+        for index, (template, variable) in enumerate(zip(self.templates, variables)):
+            if template.line in lines:
+                template.draw(win, variable)
+                self.values[index] = variable
+
+class Camera:
+    """
+    A class to represent the visible rectangle of the maze cells,
+    which scrolls to follow a cell when it comes near the edges.
+
+    Attributes:
+        height: int
+            The height of the maze.
+        width: int
+            The width of the maze.
+        rows: int
+            The number of visible rows of cells.
+        cols: int
+            The number of visible columns of cells.
+        top: int
+            The y-coordinate of the first visible cell.
+        left: int
+            The x-coordinate of the first visible cell.
+
+    Methods:
+        follow(y, x):
+            Scrolls the camera to center the cell if it is near the edges.
+        get_rect():
+            Get the visible rectangle of cells.
+        check_visible(y, x):
+            Check whether a cell is visible.
+    """
+
+    def __init__(self, height: int, width: int, rows: int, cols: int):
+        self.height: int = height
+        self.width: int = width
+        self.rows: int = rows
+        self.cols: int = cols
+        self.top: int = 0
+        self.left: int = 0
+
+    def follow(self, y: int, x: int) -> None:
+        """
+        Scrolls the camera to center the cell if it is within a quarter of the view from the edges.
+
+        Args:
+            y:  int
+                The y-coordinate of the cell to follow.
+            x:  int
+                The x-coordinate of the cell to follow.
+        """
+
+        margin_y, margin_x = self.rows // 4, self.cols // 4
+        if not self.top + margin_y <= y < self.top + self.rows - margin_y:
+            self.top = max(0, min(y - self.rows // 2, self.height - self.rows))
+        if not self.left + margin_x <= x < self.left + self.cols - margin_x:
+            self.left = max(0, min(x - self.cols // 2, self.width - self.cols))
+
+    def get_rect(self) -> tuple[int, int, int, int]:
+        """
+        Get the visible rectangle of cells.
+
+        Returns:
+            tuple[int, int, int, int]
+                The top, left, bottom and right of the rectangle, the bottom and right are exclusive.
+        """
+
+        return self.top, self.left, self.top + self.rows, self.left + self.cols
+
+    def check_visible(self, y: int, x: int) -> bool:
+        """
+        Check whether a cell is visible.
+        """
+
+        return self.top <= y < self.top + self.rows and self.left <= x < self.left + self.cols
+
+class FrameBuffer:
+    """
+    A class to keep the cells of a window in memory,
+    and flush only the cells changed since the last flush to the window.
+
+    Attributes:
+        height: int
+            The height of the buffer.
+        width: int
+            The width of the buffer.
+        cells: list[list[tuple[str, int]]]
+            The frame being drawn, each cell stores its character and color pair number.
+        frame: list[list[tuple[str, int]]] or None
+            The frame last flushed to the window, None if the content of the window is unknown.
+        stats: dict[str, int]
+            The number of addstr calls made and the number of addch calls saved by flushing runs.
+        camera: Camera or None
+            The camera which maps the maze cells to the buffer, initialized as None.
+
+    Methods:
+        getmaxyx():
+            Get the height and width of the buffer.
+        erase():
+            Erases all the cells of the frame being drawn.
+        put(y, x, chars, color):
+            Puts the characters with the color at the given coordinates.
+        snapshot():
+            Get a copy of the cells of the frame being drawn.
+        paste(cells, rows=None):
+            Replaces the frame being drawn, or only the given rows of it, by a copy of the given cells.
+        invalidate():
+            Forgets the last flushed frame, so the next flush writes every cell.
+        resize(height, width):
+            Resizes the buffer in place, so the sprites drawing on it keep working.
+        diff():
+            Get the runs of the changed cells which have the same color.
+        flush(win):
+            Writes the runs of the changed cells to the window.
+    """
+
+    blank: tuple[str, int] = (" ", 0)
+
+    def __init__(self, height: int, width: int):
+        self.height: int = height
+        self.width: int = width
+        self.cells: list[list[tuple[str, int]]] = []
+        self.frame: Optional[list[list[tuple[str, int]]]] = None
+        self.stats: dict[str, int] = {"calls": 0, "saved": 0}
+        self.camera: Optional[Camera] = None
+        self.erase()
+
+    def getmaxyx(self) -> tuple[int, int]:
+        """
+        Get the height and width of the buffer.
+
+        Returns:
+            tuple[int, int]
+                The height and width, as curses.window.getmaxyx does.
+        """
+
+        return self.height, self.width
+
+    def erase(self) -> None:
+        """
+        Erases all the cells of the frame being drawn.
+        """
+
+        self.cells = [[self.blank] * self.width for _ in range(self.height)]
+
+    def put(self, y: int, x: int, chars: str, color: int) -> None:
+        """
+        Puts the characters with the color at the given coordinates,
+        a wide character also takes the cell after it, and the characters out of the buffer are dropped.
+
+        Args:
+            y:      int
+                The y-coordinate of the first character.
+            x:      int
+                The x-coordinate of the first character.
+            chars:  str
+                The characters to be put.
+            color:  int
+                The color pair number of the characters.
+        """
+
+        if not 0 <= y < self.height:
+            return
+        row = self.cells[y]
+        for char in chars:
+            if 0 <= x < self.width:
+                row[x] = (char, color)
+            x += 1
+            if char > "\x7f" and unicodedata.east_asian_width(char) in "WF":
+                if 0 <= x < self.width:
+                    row[x] = ("", color)
+                x += 1
+
+    def snapshot(self) -> list[list[tuple[str, int]]]:
+        """
+        Get a copy of the cells of the frame being drawn.
+
+        Returns:
+            list[list[tuple[str, int]]]
+                The copied cells which can be passed to paste.
+        """
+
+        return [row.copy() for row in self.cells]
+
+    def paste(self, cells: list[list[tuple[str, int]]], rows=None) -> None:
+        """
+        Replaces the frame being drawn, or only the given rows of it, by a copy of the given cells.
+
         Args:
-            fillins:    Any
-                The fillings which to be filled in the text.        
+            cells:  list[list[tuple[str, int]]]
+                The cells returned by snapshot of a buffer with the same size.
+            rows:   Iterable[int], optional
+                The y-coordinates of the rows to be replaced (default is None for all rows).
+        """
+
+        if rows is None:
+            self.cells = [row.copy() for row in cells]
+        else:
+            for y in rows:
+                self.cells[y] = cells[y].copy()
+
+    def invalidate(self) -> None:
+        """
+        Forgets the last flushed frame, so the next flush writes every cell.
         """
 
-        self.content = self.content % fillins
+        self.frame = None
 
-    def draw(self, win: curses.window) -> None:
+    def resize(self, height: int, width: int) -> None:
         """
-        Draws the text on the given window
+        Resizes the buffer in place, so the sprites drawing on it keep working,
+        the cells are erased and the last flushed frame is forgotten.
+
+        Args:
+            height: int
+                The new height of the buffer.
+            width:  int
+                The new width of the buffer.
+        """
+
+        self.height = height
+        self.width = width
+        self.erase()
+        self.invalidate()
+
+    def diff(self):
+        """
+        Get the runs of the changed cells which have the same color,
+        then the frame being drawn becomes the last flushed frame.
+
+        Yields:
+            tuple[int, int, str, int]
+                The y-coordinate, x-coordinate, characters and color pair number of a run.
+        """
+
+        frame = self.frame
+        for y, row in enumerate(self.cells):
+            last_row = None if frame is None else frame[y]
+            if row == last_row:
+                continue
+            x = 0
+            while x < self.width:
+                if last_row is not None and row[x] == last_row[x]:
+                    x += 1
+                    continue
+                run_x = x
+                run_chars, run_color = row[x]
+                x += 1
+                while x < self.width and (last_row is None or row[x] != last_row[x]) and row[x][1] == run_color:
+                    run_chars += row[x][0]
+                    x += 1
+                self.stats["calls"] += 1
+                self.stats["saved"] += x - run_x - 1
+                yield y, run_x, run_chars, run_color
+        self.frame = self.snapshot()
+
+    def flush(self, win: curses.window) -> int:
+        """
+        Writes the runs of the changed cells to the window.
 
         Args:
             win:    curses.window
-                The curses window where the text will be drawn.
+                The curses window with the same size as the buffer.
+
+        Returns:
+            int
+                The number of addstr calls made.
         """
 
-        height, width = win.getmaxyx()
-        y = self.line
-        x = ((width - len(self.content)) // 2 if self.align else 0) + self.indent
-        win.addstr(y, x, self.content, curses.color_pair(self.color))
+        count = 0
+        for y, x, chars, color in self.diff():
+            try:
+                win.addstr(y, x, chars, curses.color_pair(color))
+            except curses.error: # Writing to the bottom right corner moves the cursor out of the window
+                pass
+            count += 1
+        return count
+
+class FrameTimer:
+    """
+    A class to measure the phases of the frames,
+    and keep the latest samples of each phase per screen type to calculate the percentiles.
+
+    Attributes:
+        size: int
+            The number of the latest samples kept for each phase.
+        samples: dict[str, dict[str, deque[int]]]
+            The latest durations in nanoseconds, stored by the screen type and the phase.
+        counts: dict[str, int]
+            The total number of frames measured, stored by the screen type.
+        overruns: dict[str, int]
+            The total number of frames which exceeded their budget, stored by the screen type.
+
+    Methods:
+        record(screen, **phases):
+            Records the durations of the phases of a frame.
+        record_overrun(screen, count=1):
+            Records the frames which exceeded their budget.
+        get_percentiles(screen, phase, percentiles=(50, 95, 99)):
+            Get the percentiles of the latest durations of a phase.
+        summarize():
+            Summarize the percentiles of all the phases of all the screen types.
+        dump(path):
+            Dumps the summary to the file by the given path in JSON.
+    """
+
+    def __init__(self, size: int=1000):
+        self.size: int = size
+        self.samples: dict[str, dict[str, deque[int]]] = {}
+        self.counts: dict[str, int] = {}
+        self.overruns: dict[str, int] = {}
+
+    def record(self, screen: str, **phases: int) -> None:
+        """
+        Records the durations of the phases of a frame.
+
+        Args:
+            screen: str
+                The screen type of the frame, such as game or menu.
+            phases: int
+                The durations in nanoseconds by the phase names, or other samples such as the depths of a queue.
+        """
+
+        screen_samples = self.samples.setdefault(screen, {})
+        for phase, duration in phases.items():
+            if phase not in screen_samples:
+                screen_samples[phase] = deque(maxlen=self.size)
+            screen_samples[phase].append(duration)
+        self.counts[screen] = self.counts.get(screen, 0) + 1
+
+    def record_overrun(self, screen: str, count: int=1) -> None:
+        """
+        Records the frames which exceeded their budget.
+
+        Args:
+            screen: str
+                The screen type of the frames, such as tick.
+            count:  int, optional
+                The number of the frames (default is 1).
+        """
+
+        self.overruns[screen] = self.overruns.get(screen, 0) + count
+
+    def get_percentiles(self, screen: str, phase: str, percentiles: tuple[int, ...]=(50, 95, 99)) -> dict[str, int]:
+        """
+        Get the percentiles of the latest durations of a phase.
+
+        Args:
+            screen:         str
+                The screen type of the frames.
+            phase:          str
+                The phase of the frames.
+            percentiles:    tuple[int, ...], optional
+                The percentiles to be calculated (default is p50, p95 and p99).
+
+        Returns:
+            dict[str, int]
+                The durations in nanoseconds by the percentile names, empty if there is no sample.
+        """
+
+        samples = sorted(self.samples.get(screen, {}).get(phase, ()))
+        if not samples:
+            return {}
+        return {f"p{percentile}": samples[min(len(samples) - 1, len(samples) * percentile // 100)] for percentile in percentiles}
+
+    def summarize(self) -> dict[str, dict[str, Any]]:
+        """
+        Summarize the percentiles of all the phases of all the screen types.
+
+        Returns:
+            dict[str, dict[str, Any]]
+                The number of frames, the number of overruns if any and the percentiles of each phase by the screen type.
+        """
+
+        summary = {}
+        for screen, screen_samples in self.samples.items():
+            summary[screen] = {"frames": self.counts[screen]}
+            if screen in self.overruns:
+                summary[screen]["overruns"] = self.overruns[screen]
+            for phase in screen_samples:
+                summary[screen][phase] = self.get_percentiles(screen, phase)
+        return summary
+
+    def dump(self, path: str) -> None:
+        """
+        Dumps the summary to the file by the given path in JSON.
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.summarize(), f, indent=4)
+
 
 class Displayer:
     """
-    A class to handle the display operations for the game.
+    A class to handle the display operations for the game,
+    where the phases of each game and menu frame are measured by the timer.
 
     Attributes:
         screen: curses.window
             The main screen window where the game is displayed.
         win: curses.window or None
             The window for playing the current game content, initialized as None.
+        buffer: FrameBuffer or None
+            The frame buffer where the sprites and texts are drawn before flushing to win, initialized as None.
+        layer: list[list[tuple[str, int]]] or None
+            The cached cells of the static blocks of the current maze, initialized as None.
+        layer_base: tuple[Block, ...] or None
+            The base blocks of the maze which the layer is built for, initialized as None.
+        layer_indices: frozenset[int]
+            The indices of the maze cells which are not covered by the layer.
+        layer_rect: tuple[int, int, int, int] or None
+            The visible rectangle of cells which the layer is built for, initialized as None.
+        layer_size: tuple[int, int] or None
+            The size of a cell which the layer is built with, initialized as None.
+        camera: Camera or None
+            The camera of the current window, initialized as None.
+        size: tuple[int, int]
+            The size of a cell in the current window, the layer is rebuilt when it differs from the layer size.
+        maze: Maze or None
+            The maze displayed in the current window, whose player is followed by the camera.
+        menu: Menu or None
+            The menu displayed in the current window, whose slots are patched by the next display.
+        timer: FrameTimer
+            The timer which measures the erase, draw and refresh phases of each frame.
     
     Methods:
         erase_win(win: curses.window):
             Erases the contents of a given window.
         create_win(height, width, size=(1, 1)):
-            Creates a new window with the given height, width and size, then update self.win.
+            Creates a new window with the given height, width and size, then update self.win and self.buffer.
+        resize_win(size=None):
+            Relayouts the current window after the terminal is resized.
+        place_win(height, width, size):
+            Computes the visible cells and the placement of a window on the current screen.
+        new_win(height, width, y, x):
+            Creates a new window of the backend at the given origin.
+        build_layer(maze):
+            Renders the static blocks of the maze into a cached layer and sets it to the maze.
+        flush():
+            Flushes the changed cells of the buffer to the window and refreshes it.
         display_game(displaying_sprites)
             Displays the game by drawing all the given sprites.
-        display_menu(texts, variables=None):
-            Displays the menu with the given texts and variables.    
+        display_menu(menu, variables=None):
+            Displays the menu with the given variables.    
     """
 
     def __init__(self, screen: curses.window):
         self.screen: curses.window = screen
         self.win: Optional[curses.window] = None
+        self.buffer: Optional[FrameBuffer] = None
+        self.layer: Optional[list[list[tuple[str, int]]]] = None
+        self.layer_base: Optional[tuple] = None
+        self.layer_indices: frozenset[int] = frozenset()
+        self.layer_rect: Optional[tuple[int, int, int, int]] = None
+        self.layer_size: Optional[tuple[int, int]] = None
+        self.camera: Optional[Camera] = None
+        self.size: tuple[int, int] = (1, 1)
+        self.maze: Optional["Maze"] = None
+        self.menu: Optional[Menu] = None
+        self.timer: FrameTimer = FrameTimer()
 
     @staticmethod
     def erase_win(win: curses.window) -> None:
         """
-        Erases the contents of a given window.
+        Erases the contents of a given window,
+        the window is only marked for the next update so a screen transition costs a single terminal update.
 
         Args:
             win:    curses.window
                 The window whose content will be erased
         
         Steps:
-            1. Erase the content of the window.
-            2. Get the height and width of the window.
-            3. Add space to the window with the specific color.
-            4. Refresh the window.
+            1. Set the background of the window to space with the specific color.
+            2. Erase the content of the window, which fills it with the background.
+            3. Restore the background so the cells drawn later keep their own colors.
+            4. Mark the window for the next update of the terminal.
         """
         
+        win.bkgdset(" ", curses.color_pair(6))
         win.erase()
-        h, w = win.getmaxyx()
-        win.addstr(" " * (h * w - 1), curses.color_pair(6))
-        win.insstr(h - 1, w - 1, " ", curses.color_pair(6))
-        win.refresh()
+        win.bkgdset(" ", 0)
+        win.noutrefresh()
 
     def create_win(self, height: int, width: int, size: tuple[int, int]=(1,1)) -> curses.window:
         """
-        Creates a new window with the given height, width and size, then update self.win.
+        Creates a new window with the given height, width and size, then update self.win and self.buffer.
+        If the window does not fit in the screen, only a part of it is visible through the camera.
 
         Args:
             height: int
@@ -124,52 +724,515 @@ class Displayer:
                 The window to be displayed.
         """
 
-        window_height = height * size[0] + 2
-        window_width = width * size[1] + 2
-        screen_height, screen_width = self.screen.getmaxyx()
-        window_origin_y = (screen_height - window_height) // 2
-        window_origin_x = (screen_width - window_width) // 2
-        self.win = curses.newwin(window_height, window_width, window_origin_y, window_origin_x)
+        rows, cols, window_height, window_width, window_origin_y, window_origin_x = self.place_win(height, width, size)
+        self.win = self.new_win(window_height, window_width, window_origin_y, window_origin_x)
+        self.buffer = FrameBuffer(window_height, window_width)
+        self.camera = Camera(height, width, rows, cols)
+        self.size = size
+        self.maze = None
+        self.menu = None
+        self.erase_win(self.screen)
+        return self.win
+
+    def resize_win(self, size: Optional[tuple[int, int]]=None) -> curses.window:
+        """
+        Relayouts the current window after the terminal is resized,
+        the assets and the sprites are kept and only the placement of the window is recomputed.
+
+        Args:
+            size: tuple[int, int], optional
+                A tuple represents the size in terms of height and width (default is None for the current size).
+
+        Returns:
+            curses.window:
+                The window at its new origin.
+
+        Steps:
+            1. Compute the placement of the window on the resized screen.
+            2. Create the window at the new origin.
+            3. Keep the buffer and the camera if the window has the same size,
+               otherwise resize the buffer, create a new camera and discard the cached layer and menu frame.
+            4. Erase the screen and the window, then re-blit the kept buffer.
+        """
+
+        size = self.size if size is None else size
+        height, width = self.camera.height, self.camera.width
+        rows, cols, window_height, window_width, window_origin_y, window_origin_x = self.place_win(height, width, size)
+        self.win = self.new_win(window_height, window_width, window_origin_y, window_origin_x)
+        kept = size == self.size and self.buffer.getmaxyx() == (window_height, window_width)
+        if not kept:
+            self.buffer.resize(window_height, window_width)
+            self.camera = Camera(height, width, rows, cols)
+            self.layer = None
+            self.size = size
+            self.menu = None
         self.erase_win(self.screen)
+        self.erase_win(self.win)
+        if kept:
+            self.buffer.invalidate()
+            self.flush()
         return self.win
 
+    def place_win(self, height: int, width: int, size: tuple[int, int]) -> tuple[int, int, int, int, int, int]:
+        """
+        Computes the visible cells and the placement of a window on the current screen,
+        the window is centered and clamped to the screen.
+
+        Args:
+            height: int
+                The height of the window.
+            width: int
+                The width of the window.
+            size: tuple[int, int]
+                A tuple represents the size in terms of height and width.
+
+        Returns:
+            tuple[int, int, int, int, int, int]:
+                The visible rows and columns of cells, the height and width of the window, and its origin.
+        """
+
+        screen_height, screen_width = self.screen.getmaxyx()
+        rows = max(1, min(height, (screen_height - 2) // size[0]))
+        cols = max(1, min(width, (screen_width - 2) // size[1]))
+        window_height = rows * size[0] + 2
+        window_width = cols * size[1] + 2
+        window_origin_y = max(0, (screen_height - window_height) // 2)
+        window_origin_x = max(0, (screen_width - window_width) // 2)
+        return rows, cols, window_height, window_width, window_origin_y, window_origin_x
+
+    def new_win(self, height: int, width: int, y: int, x: int) -> curses.window:
+        """
+        Creates a new window of the backend at the given origin.
+
+        Args:
+            height: int
+                The height of the window.
+            width: int
+                The width of the window.
+            y: int
+                The y-coordinate of the origin on the screen.
+            x: int
+                The x-coordinate of the origin on the screen.
+
+        Returns:
+            curses.window:
+                The new curses window.
+        """
+
+        return curses.newwin(height, width, y, x)
+
+    def build_layer(self, maze: "Maze") -> None:
+        """
+        Renders the visible static blocks of the maze into a cached layer and sets it to the maze,
+        the layer is reused if it has been built for the same maze, camera rectangle, cell size and window size.
+        The camera of the window follows the player of the maze since then.
+
+        Args:
+            maze:   Maze
+                The maze whose static blocks will be rendered.
+        """
+
+        self.maze = maze
+        self.buffer.camera = self.camera
+        self.camera.follow(maze.player.y, maze.player.x)
+        height, width = self.buffer.getmaxyx()
+        rect = self.camera.get_rect()
+        if (
+            self.layer is None or self.layer_base is not maze.blocks.base or self.layer_rect != rect
+            or self.layer_size != self.size
+            or (len(self.layer), len(self.layer[0])) != (height, width)
+        ):
+            layer = FrameBuffer(height, width)
+            layer.camera = self.camera
+            self.layer_indices = maze.draw_static(layer)
+            self.layer = layer.snapshot()
+            self.layer_base = maze.blocks.base
+            self.layer_rect = rect
+            self.layer_size = self.size
+        maze.set_layer(self.layer, self.layer_indices)
+
+    def flush(self) -> None:
+        """
+        Flushes the changed cells of the buffer to the window,
+        then updates the terminal together with the windows erased before.
+        """
+
+        self.buffer.flush(self.win)
+        self.win.noutrefresh()
+        curses.doupdate()
+
     def display_game(self, displaying_sprites: list["Sprite"]) -> None:
         """
-        Displays the game by drawing all the given sprites.
+        Displays the game by drawing all the given sprites into the buffer,
+        then only the changed cells are written to the window.
+        The camera follows the player and the layer is rebuilt if the camera scrolls.
         
         Args:
             displaying_sprites: list[Sprite]
                 A list of the sprites to be drawn.
         """
 
-        self.win.erase()
+        start = time.perf_counter_ns()
+        if self.maze is not None:
+            self.build_layer(self.maze)
+        self.buffer.erase()
+        erased = time.perf_counter_ns()
         for displaying_sprite in displaying_sprites:
             displaying_sprite.draw()
-        self.win.refresh()
+        drawn = time.perf_counter_ns()
+        self.flush()
+        refreshed = time.perf_counter_ns()
+        self.timer.record("game", erase=erased - start, draw=drawn - erased, refresh=refreshed - drawn, total=refreshed - start)
 
-    def display_menu(self, texts: list["Text"], variables = None) -> None:
+    def display_menu(self, menu: Menu, variables = None) -> None:
         """
-        Displays the menu with the given texts and variables.
+        Displays the menu with the given variables,
+        the static frame is drawn only when the menu is shown in the window for the first time,
+        later only the slots whose variables have changed are patched.
         
         Args:
-            texts:  list[Text]
-                A list of the texts to be displayed.
+            menu:  Menu
+                The compiled menu to be displayed.
             variables: list[Any], optional
                 A list of variables to be filled in (default is None).     
         """
 
-        if variables is None:
-            variables = iter([])
-        else:
-            variables = iter(variables)
-        self.win.erase()
-        for text in texts:
-            if text.variable:
-                variable = next(variables)
-                text.fillin_variable(variable)
-            text.draw(self.win)
+        start = time.perf_counter_ns()
+        if self.menu is not menu:
+            menu.draw_frame(self.buffer)
+            self.menu = menu
+        erased = time.perf_counter_ns()
+        menu.draw_slots(self.buffer, [] if variables is None else list(variables))
+        drawn = time.perf_counter_ns()
+        self.flush()
+        refreshed = time.perf_counter_ns()
+        self.timer.record("menu", erase=erased - start, draw=drawn - erased, refresh=refreshed - drawn, total=refreshed - start)
+
+
+class HeadlessWindow:
+    """
+    A class to simulate a curses window on an in-memory screen,
+    which counts the draw calls and the bytes written.
+
+    Attributes:
+        screen: FrameBuffer
+            The in-memory screen shared by all windows.
+        height: int
+            The height of the window.
+        width: int
+            The width of the window.
+        origin: tuple[int, int]
+            The coordinate of the top left corner of the window on the screen.
+        stats: dict[str, int]
+            The counters shared by all windows, including calls, bytes and refreshes.
+
+    Methods:
+        getmaxyx():
+            Get the height and width of the window.
+        erase():
+            Erases the contents of the window with the given color.
+        addstr(y, x, chars, color):
+            Writes the characters with the color at the given coordinates.
+        refresh():
+            Counts a refresh of the window.
+    """
+
+    def __init__(self, screen: FrameBuffer, height: int, width: int, y: int, x: int, stats: dict[str, int]):
+        self.screen: FrameBuffer = screen
+        self.height: int = height
+        self.width: int = width
+        self.origin: tuple[int, int] = (y, x)
+        self.stats: dict[str, int] = stats
+
+    def getmaxyx(self) -> tuple[int, int]:
+        """
+        Get the height and width of the window.
+        """
+
+        return self.height, self.width
+
+    def erase(self, color: int=0) -> None:
+        """
+        Erases the contents of the window with the given color.
+        """
+
+        for y in range(self.height):
+            self.addstr(y, 0, get_blank_row(self.width), color)
+
+    def addstr(self, y: int, x: int, chars: str, color: int) -> None:
+        """
+        Writes the characters with the color at the given coordinates.
+
+        Args:
+            y:      int
+                The y-coordinate of the first character.
+            x:      int
+                The x-coordinate of the first character.
+            chars:  str
+                The characters to be written.
+            color:  int
+                The color pair number of the characters.
+        """
+
+        origin_y, origin_x = self.origin
+        self.screen.put(origin_y + y, origin_x + x, chars[:max(self.width - x, 0)], color)
+        self.stats["calls"] += 1
+        self.stats["bytes"] += len(chars.encode())
+
+    def refresh(self) -> None:
+        """
+        Counts a refresh of the window.
+        """
+
+        self.stats["refreshes"] += 1
+
+
+class HeadlessDisplayer(Displayer):
+    """
+    A subclass of Displayer which renders into an in-memory screen instead of a terminal,
+    so the game can be simulated and benchmarked without a TTY.
+
+    Attributes:
+        stats: dict[str, int]
+            The number of draw calls, bytes written and refreshes made by all windows.
+
+    Methods:
+        erase_win(win):
+            Erases the contents of a given headless window.
+        new_win(height, width, y, x):
+            Creates a new headless window at the given origin.
+        flush():
+            Flushes the changed cells of the buffer to the headless window.
+        get_lines():
+            Get the characters on the in-memory screen line by line.
+    """
+
+    def __init__(self, height: int=50, width: int=200):
+        self.stats: dict[str, int] = {"calls": 0, "bytes": 0, "refreshes": 0}
+        super().__init__(HeadlessWindow(FrameBuffer(height, width), height, width, 0, 0, self.stats))
+
+    @staticmethod
+    def erase_win(win: HeadlessWindow) -> None:
+        """
+        Erases the contents of a given headless window.
+
+        Args:
+            win:    HeadlessWindow
+                The window whose content will be erased
+        """
+
+        win.erase(6)
+        win.refresh()
+
+    def new_win(self, height: int, width: int, y: int, x: int) -> HeadlessWindow:
+        """
+        Creates a new headless window at the given origin.
+
+        Returns:
+            HeadlessWindow:
+                The new window on the in-memory screen.
+        """
+
+        return HeadlessWindow(self.screen.screen, height, width, y, x, self.stats)
+
+    def flush(self) -> None:
+        """
+        Flushes the changed cells of the buffer to the headless window.
+        """
+
+        for y, x, chars, color in self.buffer.diff():
+            self.win.addstr(y, x, chars, color)
         self.win.refresh()
 
+    def get_lines(self) -> list[str]:
+        """
+        Get the characters on the in-memory screen line by line.
+
+        Returns:
+            list[str]
+                The lines of the screen.
+        """
+
+        return ["".join(char for char, color in row) for row in self.screen.screen.cells]
+
+
+class AnsiWindow:
+    """
+    A class to represent a window drawn by ANSI escape sequences,
+    which only keeps the size and the origin of the window.
+
+    Attributes:
+        height: int
+            The height of the window.
+        width: int
+            The width of the window.
+        origin: tuple[int, int]
+            The coordinate of the top left corner of the window on the screen.
+
+    Methods:
+        getmaxyx():
+            Get the height and width of the window.
+        getbegyx():
+            Get the coordinate of the top left corner of the window.
+        refresh():
+            Does nothing since the escape sequences are written directly.
+    """
+
+    def __init__(self, height: int, width: int, y: int, x: int):
+        self.height: int = height
+        self.width: int = width
+        self.origin: tuple[int, int] = (y, x)
+
+    def getmaxyx(self) -> tuple[int, int]:
+        """
+        Get the height and width of the window.
+        """
+
+        return self.height, self.width
+
+    def getbegyx(self) -> tuple[int, int]:
+        """
+        Get the coordinate of the top left corner of the window.
+        """
+
+        return self.origin
+
+    def refresh(self) -> None:
+        """
+        Does nothing since the escape sequences are written directly.
+        """
+
+
+class AnsiDisplayer(Displayer):
+    """
+    A subclass of Displayer which writes the changes of each frame as ANSI escape sequences,
+    the whole frame is composed into one byte string and sent by a single os.write.
+    The input is still read by curses from the screen.
+
+    Attributes:
+        fd: int
+            The file descriptor of the terminal.
+        sgrs: dict[int, str]
+            The SGR sequences of the color pairs, mapped from the color configurations.
+        stats: dict[str, int]
+            The number of writes made and bytes written.
+
+    Methods:
+        get_sgrs(colors):
+            Maps the color configurations to the SGR sequences of the color pairs.
+        write(chunks):
+            Writes the escape sequences to the terminal by a single os.write.
+        erase_win(win):
+            Erases the contents of a given window.
+        new_win(height, width, y, x):
+            Creates a new ANSI window at the given origin.
+        flush():
+            Flushes the changed cells of the buffer as escape sequences.
+    """
+
+    color_codes: dict[str, int] = {
+        "black": 0,
+        "red": 1,
+        "green": 2,
+        "yellow": 3,
+        "blue": 4,
+        "magenta": 5,
+        "cyan": 6,
+        "white": 7
+    }
+
+    def __init__(self, screen: curses.window, colors: list[list[str]], fd: Optional[int]=None):
+        super().__init__(screen)
+        self.fd: int = sys.stdout.fileno() if fd is None else fd
+        self.sgrs: dict[int, str] = self.get_sgrs(colors)
+        self.stats: dict[str, int] = {"writes": 0, "bytes": 0}
+
+    @classmethod
+    def get_sgrs(cls, colors: list[list[str]]) -> dict[int, str]:
+        """
+        Maps the color configurations to the SGR sequences of the color pairs,
+        the color pair 0 is white on black as it is in curses.
+
+        Args:
+            colors: list[list[str]]
+                The foreground and background color names of each color pair, as loaded by ColorLoader.
+
+        Returns:
+            dict[int, str]
+                The SGR sequences by the color pair number.
+        """
+
+        sgrs = {0: f"\x1b[0;{30 + cls.color_codes['white']};{40 + cls.color_codes['black']}m"}
+        for index, (fg, bg) in enumerate(colors):
+            sgrs[index + 1] = f"\x1b[0;{30 + cls.color_codes[fg]};{40 + cls.color_codes[bg]}m"
+        return sgrs
+
+    def write(self, chunks: list[str]) -> None:
+        """
+        Writes the escape sequences to the terminal by a single os.write,
+        the colors are reset at the end so curses is not affected.
+
+        Args:
+            chunks: list[str]
+                The escape sequences and characters to be written.
+        """
+
+        data = ("".join(chunks) + "\x1b[0m").encode()
+        self.stats["bytes"] += len(data)
+        while data: # A terminal may accept only part of a large write
+            data = data[os.write(self.fd, data):]
+            self.stats["writes"] += 1
+
+    def erase_win(self, win: AnsiWindow) -> None:
+        """
+        Erases the contents of a given window, which may also be the curses screen.
+
+        Args:
+            win:    AnsiWindow
+                The window whose content will be erased
+        """
+
+        height, width = win.getmaxyx()
+        origin_y, origin_x = win.getbegyx()
+        chunks = [self.sgrs[6]]
+        for y in range(height):
+            chunks.append(f"\x1b[{origin_y + y + 1};{origin_x + 1}H")
+            chunks.append(get_blank_row(width))
+        if (origin_y + height, origin_x + width) == self.screen.getmaxyx():
+            chunks[-1] = get_blank_row(width - 1) # Writing to the bottom right corner may scroll the terminal
+        self.write(chunks)
+        if self.buffer is not None: # The cells flushed to the window may be erased
+            self.buffer.invalidate()
+
+    def new_win(self, height: int, width: int, y: int, x: int) -> AnsiWindow:
+        """
+        Creates a new ANSI window at the given origin.
+
+        Returns:
+            AnsiWindow:
+                The new window of the size and origin.
+        """
+
+        return AnsiWindow(height, width, y, x)
+
+    def flush(self) -> None:
+        """
+        Flushes the changed cells of the buffer as escape sequences,
+        which are composed of cursor moves, SGR colors and the characters of each run.
+        """
+
+        origin_y, origin_x = self.win.getbegyx()
+        chunks = []
+        last_color = None
+        for y, x, chars, color in self.buffer.diff():
+            chunks.append(f"\x1b[{origin_y + y + 1};{origin_x + x + 1}H")
+            if color != last_color:
+                chunks.append(self.sgrs[color])
+                last_color = color
+            chunks.append(chars)
+        if chunks:
+            self.write(chunks)
+
 
 class Recorder:
     """
@@ -186,6 +1249,10 @@ class Recorder:
             Get the latest record, return None if there is no record in records.
         summarize_recodes():
             Summarize the records and generate a summary. 
+        dump(path):
+            Dumps the records to the file by the given path in JSON.
+        load(path):
+            Loads the records from the file by the given path in JSON.
     """
 
     def __init__(self):
@@ -243,3 +1310,20 @@ class Recorder:
 
         return summary
 
+    def dump(self, path: str) -> None:
+        """
+        Dumps the records to the file by the given path in JSON,
+        the records with the inputs of the games can be replayed later.
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.records, f)
+
+    def load(self, path: str) -> None:
+        """
+        Loads the records from the file by the given path in JSON.
+        """
+
+        with open(path, 'r') as f:
+            self.records = json.load(f)
+
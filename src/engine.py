@@ -0,0 +1,608 @@
+import copy
+import re
+import time
+from typing import Any, Callable, Optional
+
+import blocks
+import sprites
+
+speeds: dict[str, int] = {"fast": 1, "same": 2, "slow": 4} # Ticks per Chaser Move
+action_codes: dict[str, str] = {"up": "u", "down": "d", "left": "l", "right": "r", "stay": "s"}
+
+class GameState:
+    """
+    A class to represent the complete state of a game play,
+    which can be forked and stepped without any window.
+
+    Attributes:
+        maze:       Maze
+            The maze of the game, whose blocks are a copy-on-write layout.
+        player:     Player
+            The player in the maze.
+        chasers:    list[Chaser]
+            The chasers in the maze.
+        periods:    list[int]
+            The number of ticks between two moves of each chaser in real time.
+        patrols:    Patrols
+            The routes of the chasers, which moves them in one pass and is shared by the forks.
+        ticks:      int
+            The number of ticks passed in real time.
+        version:    int
+            The number of changes made to the state, which only increases when the state changes.
+
+    Methods:
+        get_sprites():
+            Get the sprites to be displayed in drawing order.
+        fork():
+            Creates an independent copy of the state without windows.
+        step(dy, dx):
+            Moves the player by the given delta, then moves the chasers if the player moved.
+        move_player(dy, dx):
+            Moves only the player by the given delta, as the chasers move on their own in real time.
+        tick():
+            Advances the time by a tick and moves the chasers whose periods have passed.
+        check_win():
+            Checks if the player has reached the exit of the maze.
+        check_lose():
+            Checks if the player has been caught by any chaser.
+        snapshot():
+            Get a compact value of the changeable parts of the state.
+        restore(snapshot):
+            Restores the changeable parts of the state from a snapshot.
+    """
+
+    def __init__(
+        self, maze: "Maze", player: "Player", chasers: list["Chaser"],
+        periods: Optional[list[int]]=None, patrols: Optional["Patrols"]=None
+    ):
+        self.maze: "Maze" = maze
+        self.player: "Player" = player
+        self.chasers: list["Chaser"] = chasers
+        self.periods: list[int] = [speeds["same"]] * len(chasers) if periods is None else periods
+        self.patrols: "Patrols" = sprites.Patrols(chasers) if patrols is None else patrols
+        self.ticks: int = 0
+        self.version: int = 0
+
+    def get_sprites(self) -> list["Sprite"]:
+        """
+        Get the sprites to be displayed in drawing order.
+
+        Returns:
+            list[Sprite]
+                The maze, the player and the chasers.
+        """
+        return [self.maze, self.player] + self.chasers
+
+    def fork(self) -> "GameState":
+        """
+        Creates an independent copy of the state without windows.
+        Only the changed blocks of the maze are copied, the base layout and the routes are shared.
+
+        Returns:
+            GameState
+                The forked state which can be stepped without affecting this state.
+        """
+        maze = copy.copy(self.maze)
+        maze.win = None
+        maze.blocks = self.maze.blocks.fork()
+        maze.layer = None
+
+        player = copy.copy(self.player)
+        player.win = None
+        player.maze = maze
+
+        chasers = []
+        for chaser in self.chasers:
+            chaser = copy.copy(chaser)
+            chaser.win = None
+            chaser.maze = maze
+            if isinstance(chaser, sprites.AutoChaser):
+                chaser.player = player
+            chasers.append(chaser)
+
+        maze.set_player(player)
+        maze.set_chasers(chasers)
+        state = GameState(maze, player, chasers, self.periods, self.patrols)
+        state.ticks = self.ticks
+        return state
+
+    def step(self, dy: int, dx: int) -> bool:
+        """
+        Moves the player by the given delta, then moves the chasers if the player moved.
+
+        Args:
+            dy: int
+                The change of y-coordinate of the player.
+            dx: int
+                The change of x-coordinate of the player.
+
+        Returns:
+            bool
+                True if the player moved, otherwise False.
+        """
+        if not self.player.move(dy, dx):
+            return False
+        self.patrols.move(self.maze, self.chasers, range(len(self.chasers)))
+        self.version += 1
+        return True
+
+    def move_player(self, dy: int, dx: int) -> bool:
+        """
+        Moves only the player by the given delta, as the chasers move on their own in real time.
+
+        Args:
+            dy: int
+                The change of y-coordinate of the player.
+            dx: int
+                The change of x-coordinate of the player.
+
+        Returns:
+            bool
+                True if the player moved, otherwise False.
+        """
+        if not self.player.move(dy, dx):
+            return False
+        self.version += 1
+        return True
+
+    def tick(self) -> bool:
+        """
+        Advances the time by a tick and moves the chasers whose periods have passed,
+        in the same order as they move after the player in step.
+
+        Returns:
+            bool
+                True if any chaser moved, otherwise False.
+        """
+        self.ticks += 1
+        due = [index for index, period in enumerate(self.periods) if self.ticks % period == 0]
+        moved = self.patrols.move(self.maze, self.chasers, due)
+        if moved:
+            self.version += 1
+        return moved
+
+    def check_win(self) -> bool:
+        """
+        Checks if the player has reached the exit of the maze.
+        """
+        return self.player.check_win()
+
+    def check_lose(self) -> bool:
+        """
+        Checks if the player has been caught by any chaser.
+        """
+        return self.player.check_lose()
+
+    def snapshot(self) -> tuple:
+        """
+        Get a compact value of the changeable parts of the state,
+        including the changed blocks, the player, the chasers, their route steps and the ticks.
+
+        Returns:
+            tuple
+                A hashable value which can be passed to restore, also after a round trip through JSON.
+        """
+        overlay = tuple((index, block.name) for index, block in self.maze.blocks.overlay.items())
+        player = (self.player.y, self.player.x, self.player.step, self.player.score)
+        chasers = tuple((chaser.y, chaser.x, getattr(chaser, "step", 0)) for chaser in self.chasers)
+        return overlay, player, chasers, self.ticks
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Restores the changeable parts of the state from a snapshot.
+
+        Args:
+            snapshot:   tuple
+                The value returned by snapshot.
+        """
+        overlay, player, chasers, self.ticks = snapshot
+        self.maze.blocks.overlay = {index: blocks.get_block(name) for index, name in overlay}
+        self.player.y, self.player.x, self.player.step, self.player.score = player
+        for chaser, (y, x, step) in zip(self.chasers, chasers):
+            chaser.y, chaser.x = y, x
+            if isinstance(chaser, sprites.FixedChaser):
+                chaser.step = step
+        self.version += 1
+
+
+def create_state(maze_loader: "MazeLoader", win: Optional[Any]=None) -> GameState:
+    """
+    Creates the state of the current maze of the loader.
+
+    Args:
+        maze_loader:    MazeLoader
+            The loader whose index points to the maze to be played.
+        win:            FrameBuffer, optional
+            The frame buffer where the sprites will be drawn (default is None for no window).
+
+    Returns:
+        GameState
+            The initial state of the maze.
+    """
+    maze_height, maze_width = maze_loader.get_basics()
+    maze = sprites.Maze(win, maze_height, maze_width, **maze_loader.get_resources())
+    player = sprites.Player(win, maze_height, maze_width, [blocks.get_block("player")], maze)
+    chasers = []
+    periods = []
+    chaser_speeds = maze_loader.get_speeds()
+    for name, route in maze_loader.get_routes().items():
+        periods.append(speeds[chaser_speeds.get(name, "same")])
+        if "auto" in name: # Auto Chasers
+            chasers.append(sprites.AutoChaser(win, maze_height, maze_width, [blocks.get_block("chaser")], maze, route, player))
+        else: # Fixed Chasers
+            chasers.append(sprites.FixedChaser(win, maze_height, maze_width, [blocks.get_block("chaser"), blocks.get_block("warning")], maze, route))
+    maze.set_player(player)
+    maze.set_chasers(chasers)
+    return GameState(maze, player, chasers, periods)
+
+
+class GameEngine:
+    """
+    A class to run the rules of the game without any window or input device,
+    which is shared by the game loop, bots and simulations.
+
+    Attributes:
+        actions:        dict[str, tuple[int, int]]
+            A class attribute which maps the actions to the moves of the player.
+        maze_loader:    MazeLoader
+            The loader of the mazes to be played.
+        win:            FrameBuffer or None
+            The frame buffer where the sprites will be drawn, None for no window.
+        state:          GameState or None
+            The state of the current game, initialized as None until reset.
+        tps:            int
+            The number of ticks per second in real time, 0 for turn-based games.
+        status:         str or None
+            The result of the current game, "win" or "lose", None if the game is not over.
+        maze_index:     int or None
+            The index of the maze of the current game, initialized as None until reset.
+        inputs:         list[tuple[str, Optional[int]]]
+            The actions and the ticks passed to step since the game started, except the idle ones.
+        interval:       int
+            The number of inputs between two keyframes.
+        keyframes:      list[tuple]
+            The snapshots of the state every interval inputs since the game started.
+
+    Methods:
+        reset(maze_index):
+            Starts a new game of the maze by the given index.
+        step(action, ticks=None):
+            Moves the player by the action and the chasers, then checks whether the game is over.
+        check(events):
+            Checks whether the game is over after the state changed.
+        apply(action, ticks=None):
+            Applies the action and the ticks to the state without recording them.
+        get_record():
+            Get the record of the game which is over.
+        replay(record):
+            Plays the game of the record again by its inputs at full speed.
+        seek(record, position, inputs=None):
+            Sets the game to the state of the record after the given number of inputs.
+    """
+
+    actions: dict[str, tuple[int, int]] = {
+        "up": (-1, 0),
+        "down": (1, 0),
+        "left": (0, -1),
+        "right": (0, 1),
+        "stay": (0, 0)
+    }
+
+    def __init__(self, maze_loader: "MazeLoader", win: Optional[Any]=None, tps: int=0, interval: int=100):
+        self.maze_loader: "MazeLoader" = maze_loader
+        self.win: Optional[Any] = win
+        self.tps: int = tps
+        self.state: Optional[GameState] = None
+        self.status: Optional[str] = None
+        self.maze_index: Optional[int] = None
+        self.inputs: list[tuple[str, Optional[int]]] = []
+        self.interval: int = interval
+        self.keyframes: list[tuple] = []
+
+    def reset(self, maze_index: int) -> GameState:
+        """
+        Starts a new game of the maze by the given index.
+
+        Args:
+            maze_index: int
+                The index of the maze to be played.
+
+        Returns:
+            GameState
+                The initial state of the game.
+        """
+        self.maze_loader.set_index(maze_index)
+        self.state = create_state(self.maze_loader, self.win)
+        self.status = None
+        self.maze_index = maze_index
+        self.inputs = []
+        self.keyframes = [self.state.snapshot()]
+        return self.state
+
+    def step(self, action: str, ticks: Optional[int]=None) -> list[str]:
+        """
+        Moves the player by the action and the chasers, then checks whether the game is over.
+        The chasers move after the player moved in turn-based games,
+        or on their own periods in the given number of ticks in real time.
+
+        Args:
+            action: str
+                One of the actions, such as "up" or "stay".
+            ticks:  int, optional
+                The number of ticks passed in real time (default is None for turn-based).
+
+        Returns:
+            list[str]
+                The events happened, including "move", "bonus", "chase", "win" and "lose".
+        """
+        if self.status is not None:
+            return []
+        if action != "stay" or ticks:
+            self.inputs.append((action, ticks))
+        events = self.apply(action, ticks)
+        if len(self.inputs) % self.interval == 0 and len(self.inputs) // self.interval == len(self.keyframes):
+            self.keyframes.append(self.state.snapshot())
+        return events
+
+    def apply(self, action: str, ticks: Optional[int]=None) -> list[str]:
+        """
+        Applies the action and the ticks to the state without recording them,
+        then checks whether the game is over after each tick as single ticks would.
+
+        Args:
+            action: str
+                One of the actions, such as "up" or "stay".
+            ticks:  int, optional
+                The number of ticks passed in real time (default is None for turn-based).
+
+        Returns:
+            list[str]
+                The events happened, including "move", "bonus", "chase", "win" and "lose".
+        """
+        state = self.state
+        score = state.player.score
+        events = []
+        if ticks is None:
+            if state.step(*self.actions[action]):
+                events.append("move")
+        else:
+            if state.move_player(*self.actions[action]):
+                events.append("move")
+            chased = False
+            for _ in range(ticks):
+                chased = state.tick() or chased
+                # Stop at the first tick ending the game as single ticks do
+                if state.check_win() or state.check_lose():
+                    break
+            if chased:
+                events.append("chase")
+        if not events:
+            return events
+        if state.player.score > score:
+            events.append("bonus")
+        return self.check(events)
+
+    def check(self, events: list[str]) -> list[str]:
+        """
+        Checks whether the game is over after the state changed,
+        the exit is checked before the chasers as the game loop does.
+
+        Args:
+            events: list[str]
+                The events happened so far.
+
+        Returns:
+            list[str]
+                The events with "win" or "lose" appended if the game is over.
+        """
+        if self.state.check_win():
+            self.status = "win"
+            events.append("win")
+        elif self.state.check_lose():
+            self.status = "lose"
+            events.append("lose")
+        return events
+
+    def get_record(self) -> Optional[dict[str, Any]]:
+        """
+        Get the record of the game which is over, the score of a lost game is 0.
+        The inputs are kept in the record with the maze, the ticks per second and the keyframes,
+        so the game can be replayed and sought.
+
+        Returns:
+            dict[str, Any] or None
+                The status, step and score of the game as the Recorder stores,
+                and the maze, tps, encoded inputs and keyframes for replays, None if the game is not over.
+        """
+        if self.status is None:
+            return None
+        player = self.state.player
+        return {
+            "status": self.status,
+            "step": player.step,
+            "score": player.score if self.status == "win" else 0,
+            "maze": self.maze_index,
+            "tps": self.tps,
+            "inputs": encode_inputs(self.inputs),
+            "interval": self.interval,
+            "keyframes": self.keyframes
+        }
+
+    def replay(self, record: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """
+        Plays the game of the record again by its inputs at full speed.
+
+        Args:
+            record: dict[str, Any]
+                A record returned by get_record.
+
+        Returns:
+            dict[str, Any] or None
+                The record of the replayed game, None if the inputs end before the game is over.
+        """
+        self.tps = record["tps"]
+        self.interval = record.get("interval", self.interval)
+        self.reset(record["maze"])
+        for action, ticks in decode_inputs(record["inputs"], bool(self.tps)):
+            self.step(action, ticks)
+        return self.get_record()
+
+    def seek(self, record: dict[str, Any], position: int, inputs: Optional[list[tuple[str, Optional[int]]]]=None) -> GameState:
+        """
+        Sets the game to the state of the record after the given number of inputs,
+        by restoring the latest keyframe before the position and applying at most interval inputs after it.
+        The current state is reused if it is of the same maze, so the sprites being displayed keep working.
+
+        Args:
+            record:     dict[str, Any]
+                A record returned by get_record.
+            position:   int
+                The number of inputs applied since the game started.
+            inputs:     list[tuple[str, Optional[int]]], optional
+                The decoded inputs of the record (default is None to decode them from the record).
+
+        Returns:
+            GameState
+                The state of the game at the position.
+        """
+        if inputs is None:
+            inputs = decode_inputs(record["inputs"], bool(record["tps"]))
+        if self.state is None or self.maze_index != record["maze"]:
+            self.reset(record["maze"])
+        self.tps = record["tps"]
+        keyframes = record.get("keyframes") or [self.keyframes[0]]
+        interval = record.get("interval", self.interval)
+        index = min(position // interval, len(keyframes) - 1)
+        self.state.restore(keyframes[index])
+        self.status = None
+        if index > 0: # The Game May Be Over at the Keyframe
+            self.check([])
+        self.inputs = inputs[:index * interval]
+        self.keyframes = list(keyframes[:index + 1])
+        self.interval = interval
+        for action, ticks in inputs[index * interval:position]:
+            self.step(action, ticks)
+        return self.state
+
+
+def encode_inputs(inputs: list[tuple[str, Optional[int]]]) -> str:
+    """
+    Encodes the inputs of a game into a compact string.
+    Each input is the code of its action after the number of ticks in real time,
+    and the runs of the same input are written once after their length and "*", such as "12*1s".
+
+    Args:
+        inputs: list[tuple[str, Optional[int]]]
+            The actions and the ticks passed to step.
+
+    Returns:
+        str
+            The encoded inputs.
+    """
+    tokens = [(str(ticks) if ticks else "") + action_codes[action] for action, ticks in inputs]
+    chunks = []
+    index = 0
+    while index < len(tokens):
+        end = index + 1
+        while end < len(tokens) and tokens[end] == tokens[index]:
+            end += 1
+        chunks.append(tokens[index] if end - index == 1 else f"{end - index}*{tokens[index]}")
+        index = end
+    return "".join(chunks)
+
+def decode_inputs(text: str, realtime: bool=False) -> list[tuple[str, Optional[int]]]:
+    """
+    Decodes the inputs of a game from the string returned by encode_inputs.
+
+    Args:
+        text:       str
+            The encoded inputs.
+        realtime:   bool, optional
+            Whether the game was played in real time (default is False for turn-based).
+
+    Returns:
+        list[tuple[str, Optional[int]]]
+            The actions and the ticks to be passed to step.
+    """
+    actions = {code: action for action, code in action_codes.items()}
+    inputs = []
+    for count, ticks, code in re.findall(r"(?:(\d+)\*)?(\d*)([a-z])", text):
+        inputs.extend([(actions[code], int(ticks or 0) if realtime else None)] * int(count or 1))
+    return inputs
+
+def coalesce_all(actions: list[str], cap: int) -> list[str]:
+    """
+    A coalescing policy which applies all the actions of a frame in order.
+    """
+    return actions
+
+def coalesce_last(actions: list[str], cap: int) -> list[str]:
+    """
+    A coalescing policy which applies only the last action of a frame.
+    """
+    return actions[-1:]
+
+def coalesce_cap(actions: list[str], cap: int) -> list[str]:
+    """
+    A coalescing policy which applies at most the last cap actions of a frame, dropping the older ones.
+    """
+    return actions[-cap:]
+
+coalescers: dict[str, Callable[[list[str], int], list[str]]] = {
+    "all": coalesce_all,
+    "last": coalesce_last,
+    "cap": coalesce_cap
+}
+
+class Ticker:
+    """
+    A class to schedule the ticks of the real time game at a fixed timestep.
+
+    Attributes:
+        rate:       int
+            The number of ticks per second.
+        period:     int
+            The duration of a tick in nanoseconds, which is also the budget to simulate a tick.
+        deadline:   int
+            The time in nanoseconds when the next tick is due.
+        catchup:    int
+            The maximum number of late ticks to be run at once, the rest of them are dropped.
+
+    Methods:
+        get_timeout():
+            Get the time in milliseconds to wait for the input before the next tick is due.
+        get_due():
+            Get the number of ticks due now and the number of late ticks dropped.
+    """
+
+    def __init__(self, rate: int, catchup: int=5):
+        self.rate: int = rate
+        self.period: int = 1_000_000_000 // rate
+        self.deadline: int = time.perf_counter_ns() + self.period
+        self.catchup: int = catchup
+
+    def get_timeout(self) -> int:
+        """
+        Get the time in milliseconds to wait for the input before the next tick is due.
+
+        Returns:
+            int
+                The timeout in milliseconds, 0 if a tick is already due.
+        """
+        return max(0, -(-(self.deadline - time.perf_counter_ns()) // 1_000_000))
+
+    def get_due(self) -> tuple[int, int]:
+        """
+        Get the number of ticks due now and the number of late ticks dropped,
+        the deadline is moved forward past the current time.
+
+        Returns:
+            tuple[int, int]
+                The number of ticks to be run and the number of ticks dropped.
+        """
+        now = time.perf_counter_ns()
+        if now < self.deadline:
+            return 0, 0
+        due = (now - self.deadline) // self.period + 1
+        self.deadline += due * self.period
+        return min(due, self.catchup), max(0, due - self.catchup)
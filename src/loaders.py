@@ -4,6 +4,7 @@ from typing import Union, Any
 
 import blocks
 import display
+import sprites
 
 class Loader:
     """
@@ -123,6 +124,7 @@ class BlockLoader(Loader):
             1. Load the JSON file and store the data in self.data.
             2. Create keys and default_data which can fill in the missing fields.
             3. Iterate over the list of block data and initialize blocks.
+            4. Build the glyph tables of the blocks for each render scale.
         """
         with open(self.path, 'r') as f:
             self.data = json.load(f)
@@ -133,6 +135,7 @@ class BlockLoader(Loader):
         for block_data in self.data["blocks"]:
             block_info = {key: block_data.get(key, default_data.get(key)) for key in keys}
             blocks.Block(**block_info)
+        blocks.build_glyphs()
 
 
 class MazeLoader(MultiLoader): 
@@ -140,17 +143,36 @@ class MazeLoader(MultiLoader):
     A subclass of Loader that loads maze configurations from a JSON file,
     and provides various information about the mazes.
 
+    Attributes:
+        layouts:    dict[int, tuple[Block, ...]]
+            The cached base blocks of the mazes which have been built, stored by their index.
+        routes:     dict[int, dict[str, Route]]
+            The cached routes of the chasers of the mazes which have been parsed, stored by their index.
+
     Methods:
         get_baiscs():
             Get the basic information of the maze, including height and width.
         get_resources():
             Get the mainly part of the maze, 
             including the start and end points and the block table.
+        get_layout():
+            Get the base blocks of the maze, which are built only once per maze.
+        prefetch(index):
+            Build the base blocks and the routes of the maze by the given index ahead of playing it.
         get_routes():
             Get the routes of the chasers in the maze.
+        parse_route(data):
+            Parse a route in the JSON file, either a start cell with the directions or a list of cells.
+        get_speeds():
+            Get the speeds of the chasers in the maze.
         get_maze_nums():
             Get the total number of the available mazes.
     """
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.layouts: dict[int, tuple["Block", ...]] = {}
+        self.routes: dict[int, dict[str, "Route"]] = {}
+
     def get_basics(self) -> tuple[int, int]:
         """
         Get the basic information of the maze, including height and width.
@@ -171,28 +193,86 @@ class MazeLoader(MultiLoader):
 
         Returns:
             dict[str, Any]
-                A dict which stores blocks list and start/end points information.
+                A dict which stores blocks layout and start/end points information.
         """
         maze_data = self.data[self.index]
         start = tuple(maze_data["start"])
         end = tuple(maze_data["end"])
-        block_names = maze_data["block_names"]
         return {
-            "blocks": [blocks.get_block(block_name) for block_name in block_names], 
+            "blocks": blocks.Layout(self.get_layout()), 
             "start": start,
             "end": end
         }
+
+    def get_layout(self) -> tuple["Block", ...]:
+        """
+        Get the base blocks of the maze, which are built only once per maze.
+
+        Returns:
+            tuple[Block, ...]
+                The immutable blocks of the maze in row-major order.
+        """
+        self.prefetch(self.index)
+        return self.layouts[self.index]
+
+    def prefetch(self, index: int) -> None:
+        """
+        Build the base blocks and the routes of the maze by the given index ahead of playing it,
+        the index out of the mazes is ignored.
+
+        Args:
+            index:  int
+                The index of the maze to be built.
+        """
+        if not 0 <= index < len(self.data):
+            return
+        if index not in self.layouts:
+            block_names = self.data[index]["block_names"]
+            self.layouts[index] = tuple(blocks.get_block(block_name) for block_name in block_names)
+        if index not in self.routes:
+            routes = self.data[index].get("routes", {})
+            self.routes[index] = {name: self.parse_route(route) for name, route in routes.items()}
     
-    def get_routes(self) -> dict[str, list[tuple[int, int]]]:
+    def get_routes(self) -> dict[str, "Route"]:
         """
-        Get the routes of the chasers in the maze.
+        Get the routes of the chasers in the maze, which are parsed only once per maze.
 
         Returns:
-            dict[str, list[tuple[int, int]]
+            dict[str, Route]
                 A dict which stores the routes of the chasers.
         """
+        self.prefetch(self.index)
+        return self.routes[self.index]
+
+    @staticmethod
+    def parse_route(data: Union[dict[str, Any], list[list[int]]]) -> Union["Route", list[tuple[int, int]]]:
+        """
+        Parse a route in the JSON file, which is either a start cell with the directions of the steps,
+        such as {"start": [3, 4], "path": "rrl"}, or a list of cells in the old format.
+
+        Args:
+            data:   dict[str, Any] or list[list[int]]
+                The route in the JSON file.
+
+        Returns:
+            Route or list[tuple[int, int]]
+                The route, or its cells if a step in the old format does not move to a neighbouring cell.
+        """
+        if isinstance(data, dict):
+            return sprites.Route(tuple(data["start"]), data["path"])
+        route = sprites.Route.from_cells(data)
+        return route if route is not None else [tuple(cell) for cell in data]
+
+    def get_speeds(self) -> dict[str, str]:
+        """
+        Get the speeds of the chasers in the maze, which are "fast", "same" or "slow" as the player.
+
+        Returns:
+            dict[str, str]
+                A dict which stores the speeds of the chasers, the chasers not listed move at the same speed.
+        """
         maze_data = self.data[self.index]
-        return maze_data.get("routes", {})
+        return maze_data.get("speeds", {})
     
     def get_maze_nums(self) -> int:
         """
@@ -210,12 +290,20 @@ class MenuLoader(MultiLoader):
     A subclass of Loader that loads menu configurations from a JSON file,
     and provides various information about the menus.
 
+    Attributes:
+        menus:  dict[str, Menu]
+            The cached menus which have been compiled, stored by their index.
+
     Methods:
         get_baiscs():
             Get the basic information of the menu, including height and width.
         get_resources():
-            Get the mainly part of the menu, including the texts.
+            Get the mainly part of the menu, which is compiled only once per menu.
     """
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.menus: dict[str, "Menu"] = {}
+
     def get_basics(self) -> tuple[int, int]:
         """
         Get the basic information of the menu, including height and width.
@@ -229,13 +317,16 @@ class MenuLoader(MultiLoader):
 
     def get_resources(self):
         """
-        Get the mainly part of the menu, including the texts.
+        Get the mainly part of the menu, which is compiled only once per menu.
 
         Returns:
-            list[Text]
-                A list of Text which will be shown in the menu.
+            Menu
+                The menu compiled from the texts which will be shown in the menu.
         """
-        menu_data = self.data[self.index]
-        return [display.Text(**text_data) for text_data in menu_data["texts"]]
+        if self.index not in self.menus:
+            menu_data = self.data[self.index]
+            texts = [display.Text(**text_data) for text_data in menu_data["texts"]]
+            self.menus[self.index] = display.Menu(menu_data["height"], menu_data["width"], texts)
+        return self.menus[self.index]
 
 
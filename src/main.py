@@ -1,19 +1,25 @@
+import asyncio
+import atexit
 import curses
 import sys
+import time
 
 import blocks
-import sprites
 import loaders
 import display
+import engine
 
+key_actions = {ord('w'): "up", ord('s'): "down", ord('a'): "left", ord('d'): "right"}
 
-def start(stdscr, displayer, menu_loader, maze_loader):
+async def start(stdscr, keys, displayer, menu_loader, maze_loader):
     """
     Initializes and starts the main menu.
     
     Args:
         stdscr:         curses.window
             The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
         displayer:      Displayer
             An object for handling the display operations.
         menu_loader:    MenuLoader
@@ -37,7 +43,7 @@ def start(stdscr, displayer, menu_loader, maze_loader):
     while True:
             
             # Keyboard Input
-            key = stdscr.getch()
+            key, _ = await keys.get()
             # Exit Game
             if key == ord('q'):
                 sys.exit()
@@ -45,7 +51,7 @@ def start(stdscr, displayer, menu_loader, maze_loader):
             # Start Game
             elif key == ord('t'):
                 maze_loader.set_index(0)
-                tutorial(stdscr, displayer, menu_loader) # Goto the tutorial menu
+                await tutorial(stdscr, keys, displayer, menu_loader) # Goto the tutorial menu
                 return "start"
 
             elif ord('1') <= key <= ord('9'):
@@ -53,16 +59,22 @@ def start(stdscr, displayer, menu_loader, maze_loader):
                 maze_loader.set_index(maze_index)
                 return "start"
 
+            # Terminal Resized
+            elif key == curses.KEY_RESIZE:
+                displayer.resize_win()
+
             # Display
             displayer.display_menu(menu_loader.get_resources())
 
-def tutorial(stdscr, displayer, menu_loader):
+async def tutorial(stdscr, keys, displayer, menu_loader):
     """
     Displays the tutorial menu.
     
     Args:
         stdscr:         curses.window
             The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
         displayer:      Displayer
             An object for handling the display operations.
         menu_loader:    MenuLoader
@@ -84,7 +96,7 @@ def tutorial(stdscr, displayer, menu_loader):
     while True:
 
         # Keyboard Input
-        key = stdscr.getch()
+        key, _ = await keys.get()
 
         # Exit Game
         if key == ord('q'):
@@ -92,23 +104,190 @@ def tutorial(stdscr, displayer, menu_loader):
         
         elif key == ord('c'):
             return "continue"
+
+        # Terminal Resized
+        elif key == curses.KEY_RESIZE:
+            displayer.resize_win()
         
         # Display
         displayer.display_menu(menu_loader.get_resources())
 
-def game(stdscr, displayer, recorder, maze_loader):
+async def read_keys(stdscr, keys):
+    """
+    Reads the keys from curses into the queue with the times they were read as a task,
+    which waits for the standard input to be readable instead of blocking on getch.
+
+    Args:
+        stdscr: curses.window
+            The main window object from curses, which is in no-delay mode.
+        keys:   asyncio.Queue
+            The queue of the keys and their times in nanoseconds to be put in.
+    """
+
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    loop.add_reader(sys.stdin.fileno(), readable.set)
+    try:
+        while True:
+            key = stdscr.getch()
+            if key != -1:
+                keys.put_nowait((key, time.perf_counter_ns()))
+                continue
+            readable.clear()
+            polling = loop.call_later(0.1, readable.set) # Resizes Do Not Make the Input Readable
+            await readable.wait()
+            polling.cancel()
+    finally:
+        loop.remove_reader(sys.stdin.fileno())
+
+async def wait_key(keys, over):
+    """
+    Waits for the next key in the queue until the event is set.
+
+    Args:
+        keys:   asyncio.Queue
+            The queue of the keys and their times read by the input task.
+        over:   asyncio.Event
+            The event which stops waiting.
+
+    Returns:
+        tuple[int, int] or None
+            The next key and its time, or None if the event is set first.
+    """
+
+    getting = asyncio.ensure_future(keys.get())
+    stopping = asyncio.ensure_future(over.wait())
+    done, _ = await asyncio.wait((getting, stopping), return_when=asyncio.FIRST_COMPLETED)
+    stopping.cancel()
+    if getting in done:
+        return getting.result()
+    getting.cancel()
+    return None
+
+async def render(displayer, state, sprites, changed, pending):
+    """
+    Displays the sprites of the game as a task whenever the state is changed,
+    the changes made before the task runs are drawn in a single frame.
+    The depths of the input queue and the latencies from the inputs to the display are recorded as "input".
+
+    Args:
+        displayer:  Displayer
+            An object for handling the display operations.
+        state:      GameState
+            The state of the game being displayed.
+        sprites:    list[Sprite]
+            The sprites to be displayed.
+        changed:    asyncio.Event
+            The event set after the state is updated.
+        pending:    list[tuple[int, int]]
+            The times of the first keys and the numbers of keys drained in the frames not displayed yet.
+    """
+
+    displayed_version = state.version
+    while True:
+        await changed.wait()
+        changed.clear()
+        if state.version != displayed_version:
+            displayer.display_game(sprites)
+            displayed_version = state.version
+        displayed = time.perf_counter_ns()
+        for stamp, depth in pending:
+            displayer.timer.record("input", depth=depth, latency=displayed - stamp)
+        pending.clear()
+
+async def simulate(game_engine, ticker, timer, changed, over):
+    """
+    Runs the ticks of the real time game as a task, at the rate of the ticker until the game is over.
+
+    Args:
+        game_engine:    GameEngine
+            The engine of the game being played.
+        ticker:         Ticker
+            The ticker scheduling the ticks.
+        timer:          FrameTimer
+            The timer recording the simulation time and the overruns of the ticks.
+        changed:        asyncio.Event
+            The event set after the state is updated.
+        over:           asyncio.Event
+            The event set when the game is over.
+    """
+
+    while True:
+        await asyncio.sleep(ticker.get_timeout() / 1000) # Wait Until the Next Tick
+        due, dropped = ticker.get_due()
+        if not due:
+            continue
+        start = time.perf_counter_ns()
+        game_engine.step("stay", due)
+        elapsed = time.perf_counter_ns() - start
+        timer.record("tick", simulate=elapsed)
+        if elapsed > due * ticker.period: # Over the Budget of the Due Ticks
+            timer.record_overrun("tick")
+        if dropped:
+            timer.record_overrun("tick", dropped)
+        if game_engine.status is not None:
+            over.set()
+            return
+        changed.set()
+
+async def prefetch(maze_loader, index):
+    """
+    Builds the maze by the given index in a worker thread of the event loop,
+    so that neither the input nor the rendering waits for it and the next level starts without building it.
+
+    Args:
+        maze_loader:    MazeLoader
+            An object for loading and initializing the maze assets.
+        index:          int
+            The index of the maze to be built.
+    """
+
+    await asyncio.sleep(0) # After the First Frame
+    await asyncio.get_running_loop().run_in_executor(None, maze_loader.prefetch, index)
+
+async def flush(dump, path, interval=5.0):
+    """
+    Dumps to the file by the given path periodically as a task,
+    so that the data is kept on the disk while the application runs.
+
+    Args:
+        dump:       Callable[[str], None]
+            The function which dumps the data to the path.
+        path:       str
+            The path to the file.
+        interval:   float, optional
+            The seconds between the dumps (default is 5.0).
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        dump(path)
+
+async def game(stdscr, keys, displayer, recorder, maze_loader, tps=0, coalesce="all", cap=4):
     """
     Initializes and runs the tutorial menu.
+    The game is turn-based by default, where the chasers move after each move of the player,
+    or in real time with the given ticks per second, where the chasers move at their own speeds.
+    The rendering and the ticks in real time run as tasks while the keys are handled here,
+    where each frame drains all the pending keys and applies their actions by the coalescing policy.
     
     Args:
         stdscr:         curses.window
             The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
         displayer:      Displayer
             An object for handling the display operations.
         recorder:       Recorder
             An object for recording the scores and steps in the game play.
         maze_loader:    MazeLoader
             An object for loading and initializing the maze assets.
+        tps:            int, optional
+            The number of ticks per second in real time (default is 0 for turn-based).
+        coalesce:       str, optional
+            The policy to coalesce the actions of a frame, which is "all", "last" or "cap" (default is "all").
+        cap:            int, optional
+            The maximum number of actions of a frame with the "cap" policy (default is 4).
     
     Returns:
         str
@@ -121,80 +300,80 @@ def game(stdscr, displayer, recorder, maze_loader):
     
     # Sprites Initialization
     maze_height, maze_width = maze_loader.get_basics()
-    win = displayer.create_win(maze_height, maze_width, blocks.get_block_size())
-    maze = sprites.Maze(win, maze_height, maze_width, **maze_loader.get_resources())
-    player = sprites.Player(win, maze_height, maze_width, [blocks.get_block("player")], maze)
-    chasers = []
-    for name, route in maze_loader.get_routes().items():
-        if "auto" in name: # Auto Chasers
-            chasers.append(sprites.AutoChaser(win, maze_height, maze_width, [blocks.get_block("chaser")], maze, route, player))
-        else: # Fixed Chasers
-            chasers.append(sprites.FixedChaser(win, maze_height, maze_width, [blocks.get_block("chaser"), blocks.get_block("warning")], maze, route))
-    maze.set_player(player)
-    maze.set_chasers(chasers)
-    displaying_sprites = [maze, player] + chasers
+    block_size = blocks.choose_block_size(maze_height, maze_width, *stdscr.getmaxyx())
+    win = displayer.create_win(maze_height, maze_width, block_size)
+    game_engine = engine.GameEngine(maze_loader, displayer.buffer, tps)
+    state = game_engine.reset(maze_loader.index)
+    displaying_sprites = state.get_sprites()
 
     # Displayer Initialization
     displayer.erase_win(stdscr)
     displayer.erase_win(win)
+    displayer.build_layer(state.maze)
     displayer.display_game(displaying_sprites)
 
-    # Game Loop
-    while True:
-
-        # Keyboard Input
-        key = stdscr.getch()
-        if key == ord('q'):
-            sys.exit()
-        elif key == ord('m'):
-            return "back"
-        elif key == ord('r'):
-            return "retry"
-        elif key == ord('w'):
-            player_dy, player_dx = -1, 0
-        elif key == ord('s'):
-            player_dy, player_dx = 1, 0
-        elif key == ord('a'):
-            player_dy, player_dx = 0, -1
-        elif key == ord('d'):
-            player_dy, player_dx = 0, 1
-        else:
-            player_dy, player_dx = 0, 0
-        
-        # Move
-        if player.move(player_dy, player_dx):          
-            for chaser in chasers:
-                chaser.move()
-        
-        # Check
-        if player.check_win():
-            record = {
-                "status": "win",
-                "step": player.step,
-                "score": player.score
-            }
-            recorder.insert_record(record)
-            return "win"
-        
-        elif player.check_lose():
-            record = {
-                "status": "lose",
-                "step": player.step,
-                "score": 0
-            }
-            recorder.insert_record(record)
-            return "lose"
+    # Tasks Initialization
+    changed = asyncio.Event()
+    over = asyncio.Event()
+    pending = []
+    tasks = [
+        asyncio.create_task(render(displayer, state, displaying_sprites, changed, pending)),
+        asyncio.create_task(prefetch(maze_loader, maze_loader.index + 1))
+    ]
+    if tps:
+        ticker = engine.Ticker(tps)
+        tasks.append(asyncio.create_task(simulate(game_engine, ticker, displayer.timer, changed, over)))
 
-        # Display
-        displayer.display_game(displaying_sprites)
+    # Game Loop
+    try:
+        while True:
 
-def end(stdscr, displayer, recorder, menu_loader, maze_loader):
+            # Keyboard Input
+            pressed = await wait_key(keys, over)
+            pressed = [pressed] if pressed is not None else []
+            while not keys.empty(): # Drain the Pending Keys
+                pressed.append(keys.get_nowait())
+            actions = []
+            for key, _ in pressed:
+                if key == ord('q'):
+                    sys.exit()
+                elif key == ord('m'):
+                    return "back"
+                elif key == ord('r'):
+                    return "retry"
+                elif key == curses.KEY_RESIZE: # Relayout without moving
+                    block_size = blocks.choose_block_size(maze_height, maze_width, *stdscr.getmaxyx())
+                    displayer.resize_win(block_size)
+                    displayer.display_game(displaying_sprites)
+                elif key in key_actions:
+                    actions.append(key_actions[key])
+
+            # Move
+            for action in engine.coalescers[coalesce](actions, cap):
+                game_engine.step(action, 0 if tps else None) # Ticks Run in Their Own Task
+                if game_engine.status is not None:
+                    break
+            if pressed:
+                pending.append((pressed[0][1], len(pressed)))
+
+            # Check
+            if game_engine.status is not None:
+                recorder.insert_record(game_engine.get_record())
+                return game_engine.status
+            changed.set()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def end(stdscr, keys, displayer, recorder, menu_loader, maze_loader):
     """
     Handle and display the end menu which will display when a level is cleared or lost.
 
     Args:
         stdscr:         curses.window
             The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
         displayer:      Displayer
             An object for handling the display operations.
         recorder:       Recorder
@@ -224,7 +403,7 @@ def end(stdscr, displayer, recorder, menu_loader, maze_loader):
     while True:
             
             # Keyboard Input
-            key = stdscr.getch()
+            key, _ = await keys.get()
 
             # Exit Game
             if key == ord('q'):
@@ -241,16 +420,22 @@ def end(stdscr, displayer, recorder, menu_loader, maze_loader):
                     else:
                         return "clear"
 
+            # Terminal Resized
+            elif key == curses.KEY_RESIZE:
+                displayer.resize_win()
+
             # Display
             displayer.display_menu(menu_loader.get_resources(), (record["step"], record["score"]))
 
-def final(stdscr, displayer, recorder, menu_loader):
+async def final(stdscr, keys, displayer, recorder, menu_loader):
     """
     Handle and display the final menu which will display when all levels are cleared.
 
     Args:
         stdscr:         curses.window
             The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
         displayer:      Displayer
             An object for handling the display operations.
         recorder:       Recorder
@@ -275,7 +460,7 @@ def final(stdscr, displayer, recorder, menu_loader):
     while True:
             
             # Keyboard Input
-            key = stdscr.getch()
+            key, _ = await keys.get()
 
             # Exit Game
             if key == ord('q'):
@@ -283,19 +468,233 @@ def final(stdscr, displayer, recorder, menu_loader):
             elif key == ord('m'):
                 return "back"
 
+            # Terminal Resized
+            elif key == curses.KEY_RESIZE:
+                displayer.resize_win()
+
             # Display
             displayer.display_menu(menu_loader.get_resources(), summary.values())
 
+async def replay(stdscr, keys, displayer, maze_loader, recorder):
+    """
+    Displays the games of the records loaded by the recorder as a replay viewer.
+    Each frame advances a real time record by as many ticks as the speed, following the ticks recorded with the inputs,
+    or a turn-based record by as many inputs as the speed, without drawing the frames between them,
+    and seeking starts from the nearest keyframe of the record.
 
-def main(stdscr):
+    Args:
+        stdscr:         curses.window
+            The main window object from curses.
+        keys:           asyncio.Queue
+            The queue of the keys and their times read by the input task.
+        displayer:      Displayer
+            An object for handling the display operations.
+        maze_loader:    MazeLoader
+            An object for loading and initializing the maze assets.
+        recorder:       Recorder
+            The recorder holding the records loaded from the --replay=<path> option.
+    """
+
+    for record in recorder.records:
+        if "inputs" not in record: # Not Replayable
+            continue
+
+        # Sprites Initialization
+        maze_loader.set_index(record["maze"])
+        maze_height, maze_width = maze_loader.get_basics()
+        block_size = blocks.choose_block_size(maze_height, maze_width, *stdscr.getmaxyx())
+        win = displayer.create_win(maze_height, maze_width, block_size)
+        game_engine = engine.GameEngine(maze_loader, displayer.buffer)
+        inputs = engine.decode_inputs(record["inputs"], bool(record["tps"]))
+        state = game_engine.seek(record, 0, inputs)
+        displaying_sprites = state.get_sprites()
+        interval = game_engine.interval
+
+        # Displayer Initialization
+        displayer.erase_win(stdscr)
+        displayer.erase_win(win)
+        displayer.build_layer(state.maze)
+        displayer.display_game(displaying_sprites)
+        displayed_version = state.version
+
+        # Replay Loop
+        position, speed, budget = 0, 1, 0
+        ticker = engine.Ticker(record["tps"] or 8)
+        while True:
+
+            # Keyboard Input
+            try: # Wait Until the Next Frame
+                key, _ = await asyncio.wait_for(keys.get(), ticker.get_timeout() / 1000)
+            except asyncio.TimeoutError:
+                key = -1
+            if key == ord('q'):
+                sys.exit()
+            elif key == ord('n'): # Next Record
+                break
+            elif key == ord('+'): # Fast Forward
+                speed = min(speed * 2, 64)
+            elif key == ord('-'):
+                speed = max(speed // 2, 1)
+            elif key == ord('a') or key == ord('d'): # Seek by a Keyframe Interval
+                position = position - interval if key == ord('a') else position + interval
+                position = max(0, min(len(inputs), position))
+                game_engine.seek(record, position, inputs)
+                budget = 0
+            elif key == curses.KEY_RESIZE:
+                block_size = blocks.choose_block_size(maze_height, maze_width, *stdscr.getmaxyx())
+                displayer.resize_win(block_size)
+                displayer.display_game(displaying_sprites)
+
+            # Move
+            due, dropped = ticker.get_due()
+            if due and position < len(inputs):
+                budget += (due + dropped) * speed
+                while position < len(inputs): # Skipped Frames Are Not Drawn
+                    action, ticks = inputs[position]
+                    cost = 1 if ticks is None else ticks # An Input per Frame in Turn-Based Games
+                    if cost > budget: # Wait for the Recorded Ticks
+                        break
+                    budget -= cost
+                    game_engine.step(action, ticks)
+                    position += 1
+            if state.version == displayed_version: # Nothing Changed
+                continue
+
+            # Display
+            displayer.display_game(displaying_sprites)
+            displayed_version = state.version
+
+async def run(stdscr, displayer, recorder, menu_loader, maze_loader, options, exports=()):
+    """
+    Runs the application in the event loop,
+    where the input task and the background tasks run alongside the menus and the game play.
+
+    Args:
+        stdscr:         curses.window
+            The standard screen object from curses.
+        displayer:      Displayer
+            An object for handling the display operations.
+        recorder:       Recorder
+            An object for recording the scores and steps in the game play.
+        menu_loader:    MenuLoader
+            An object for loading and initializing the menu assets.
+        maze_loader:    MazeLoader
+            An object for loading and initializing the maze assets.
+        options:        dict[str, Any]
+            The options of the command line, including "tps", "coalesce", "cap" and "replay".
+        exports:        Iterable[tuple[Callable[[str], None], str]], optional
+            The functions and the paths to be flushed periodically (default is ()).
+    """
+
+    # Tasks Initialization
+    keys = asyncio.Queue()
+    stdscr.nodelay(True)
+    tasks = [asyncio.create_task(read_keys(stdscr, keys))]
+    tasks += [asyncio.create_task(flush(dump, path)) for dump, path in exports]
+
+    try:
+        if options["replay"] is not None:
+            await replay(stdscr, keys, displayer, maze_loader, options["replay"])
+            return
+
+        status = "start"
+        while status == "start" or status == "back":
+            status = await start(stdscr, keys, displayer, menu_loader, maze_loader)
+
+            while status == "retry" or status == "continue" or status == "start":
+                status = await game(
+                    stdscr, keys, displayer, recorder, maze_loader, options["tps"], options["coalesce"], options["cap"]
+                )
+            
+                if status == "win" or status == "lose":
+                    status = await end(stdscr, keys, displayer, recorder, menu_loader, maze_loader)
+                
+            if status == "clear":
+                status = await final(stdscr, keys, displayer, recorder, menu_loader)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+usage = (
+    "Usage: python main.py [--ansi] [--timings] [--tps=<ticks per second>] "
+    "[--coalesce=<all|last|cap>] [--cap=<steps>] [--record=<path>] [--replay=<path>]"
+)
+
+def parse_args(args):
+    """
+    Parses the options of the command line and loads the records to be replayed before curses takes over the terminal,
+    and exits with the usage if any option is unknown or any value is invalid.
+
+    Args:
+        args:   list[str]
+            The arguments of the command line without the program.
+
+    Returns:
+        dict[str, Any]
+            The options, including "ansi", "timings", "tps", "coalesce", "cap", "records",
+            and "replay" as the Recorder of the records to be replayed.
+    """
+
+    options = {"ansi": False, "timings": False, "tps": 0, "coalesce": "all", "cap": 4, "records": [], "replay": None}
+    for arg in args:
+        if arg == "--ansi":
+            options["ansi"] = True
+        elif arg == "--timings":
+            options["timings"] = True
+        elif arg.startswith("--tps="):
+            value = arg.removeprefix("--tps=")
+            if not value.isdigit():
+                sys.exit(f"The ticks per second must be a non-negative integer, got {value}\n{usage}")
+            options["tps"] = int(value)
+        elif arg.startswith("--coalesce="):
+            value = arg.removeprefix("--coalesce=")
+            if value not in engine.coalescers:
+                sys.exit(f"Unknown coalescing policy {value}, expected one of {list(engine.coalescers)}\n{usage}")
+            options["coalesce"] = value
+        elif arg.startswith("--cap="):
+            value = arg.removeprefix("--cap=")
+            if not value.isdigit() or int(value) < 1:
+                sys.exit(f"The cap of the actions must be a positive integer, got {value}\n{usage}")
+            options["cap"] = int(value)
+        elif arg.startswith("--record="):
+            options["records"].append(arg.removeprefix("--record="))
+        elif arg.startswith("--replay="):
+            value = arg.removeprefix("--replay=")
+            recorder = display.Recorder()
+            try:
+                recorder.load(value)
+            except (OSError, ValueError) as e:
+                sys.exit(f"The records can not be loaded from {value}: {e}\n{usage}")
+            if not isinstance(recorder.records, list) or not all(isinstance(record, dict) for record in recorder.records):
+                sys.exit(f"The records in {value} must be a list of records\n{usage}")
+            replayable = [record for record in recorder.records if "inputs" in record]
+            if not replayable:
+                sys.exit(f"No replayable records in {value}, which are dumped with the --record=<path> option\n{usage}")
+            for record in replayable:
+                if not (isinstance(record.get("maze"), int) and isinstance(record.get("tps"), int) and isinstance(record["inputs"], str)):
+                    sys.exit(f"The replayable records in {value} must have the maze, the tps and the inputs\n{usage}")
+            options["replay"] = recorder
+        else:
+            sys.exit(f"Unknown option {arg}\n{usage}")
+    return options
+
+def main(stdscr, options):
     """
     The main function for the whole application,
     which initializes loaders and loads the assets,
-    while it also controls the game progress from menu to game play.
+    then runs the game progress from menu to game play in an asyncio event loop.
+    The output backend is curses by default, or ANSI escape sequences with the --ansi option.
+    The frame timings are dumped to timings.json periodically and on exit with the --timings option.
+    The game is played in real time with the --tps=<ticks per second> option, otherwise it is turn-based.
+    The keys pressed in a frame are coalesced by the --coalesce=<all|last|cap> option, where cap applies at most --cap=<steps> actions.
+    The records of the games, including their inputs for replays, are dumped periodically and on exit with the --record=<path> option,
+    and they are displayed by the replay viewer instead of the game with the --replay=<path> option.
     
     Args:
-        stdscr: curses.window
+        stdscr:     curses.window
             The standard screen object from curses.
+        options:    dict[str, Any]
+            The options of the command line returned by parse_args.
     """
 
     # Loaders Initialization
@@ -311,26 +710,21 @@ def main(stdscr):
     menu_loader.load()
 
     # Displayer and Recorder Initialization
-    displayer = display.Displayer(stdscr)
+    if options["ansi"]:
+        displayer = display.AnsiDisplayer(stdscr, color_loader.data)
+    else:
+        displayer = display.Displayer(stdscr)
     recorder = display.Recorder()
+    exports = [(recorder.dump, path) for path in options["records"]]
+    if options["timings"]:
+        exports.append((displayer.timer.dump, "./timings.json"))
+    for dump, path in exports:
+        atexit.register(dump, path)
     curses.curs_set(0)
     displayer.erase_win(stdscr)
     stdscr.refresh()
 
-    status = "start"
-    while status == "start" or status == "back":
-        status = start(stdscr, displayer, menu_loader, maze_loader)
-
-        while status == "retry" or status == "continue" or status == "start":
-            status = game(stdscr, displayer, recorder, maze_loader)
-        
-            if status == "win" or status == "lose":
-                status = end(stdscr, displayer, recorder, menu_loader, maze_loader)
-            
-        if status == "clear":
-            status = final(stdscr, displayer, recorder, menu_loader)
+    asyncio.run(run(stdscr, displayer, recorder, menu_loader, maze_loader, options, exports))
       
 
-curses.wrapper(main)
-
-
+curses.wrapper(main, parse_args(sys.argv[1:]))
@@ -1,14 +1,17 @@
-import curses
+import heapq
+from typing import Any, Iterable, Optional, Union
 
 from blocks import get_block
 
+directions: dict[str, tuple[int, int]] = {"u": (-1, 0), "d": (1, 0), "l": (0, -1), "r": (0, 1)}
+
 class Sprite:
     """
     A base class for all sprite objects in the game.
 
     Attributes:
-        win:    curses.window
-            The window or screen where the sprite will be drawn.
+        win:    FrameBuffer
+            The frame buffer where the sprite will be drawn.
         height: int
             The height of the maze.
         width:  int
@@ -20,8 +23,8 @@ class Sprite:
         draw():
             An abstract interface for drawing the sprite on the window.
     """
-    def __init__(self, win: curses.window, height: int, width: int, blocks: list["Block"]):
-        self.win: curses.window = win
+    def __init__(self, win: "FrameBuffer", height: int, width: int, blocks: list["Block"]):
+        self.win: "FrameBuffer" = win
         self.height: int = height
         self.width: int = width
         self.blocks: list["Block"] = blocks
@@ -72,6 +75,10 @@ class Maze(Sprite):
             The player object in the maze.
         chasers: list[Chaser]
             A list of chaser objects in the maze.
+        layer: list[list[tuple[str, int]]] or None
+            The cached cells of the static blocks of the maze, initialized as None.
+        layer_indices: frozenset[int]
+            The indices of the cells which are not covered by the layer.
     
     Methods:
         set_player(player):
@@ -102,16 +109,24 @@ class Maze(Sprite):
             Check whether a position contains a bonus.
         update_bonus(y, x):
             Updates the position of a bonus after being collected.
+        set_layer(layer, indices):
+            Sets the cached layer of static blocks used by the drawing.
+        get_visible_indices():
+            Get the indices of the cells which are visible through the camera of the window.
+        draw_static(win):
+            Draw the static blocks of the maze on the given window.
         draw():
             Draw the maze and its contents on the window.
     """
     def __init__(
-        self, win: curses.window, height: int, width: int, 
-        blocks: list["Block"], start: tuple[int, int], end: tuple[int, int]
+        self, win: "FrameBuffer", height: int, width: int, 
+        blocks: "Layout", start: tuple[int, int], end: tuple[int, int]
     ):
         super().__init__(win, height, width, blocks)
         self.start: tuple[int, int] = start
         self.end: tuple[int, int] = end
+        self.layer: Optional[list[list[tuple[str, int]]]] = None
+        self.layer_indices: frozenset[int] = frozenset()
     
     def set_player(self, player: "Player"):
         """
@@ -163,7 +178,9 @@ class Maze(Sprite):
         """
         Check whether a position is a valid route.
         """
-        return self.check_inrange(y, x) and not self.check_solid(y, x) and not self.check_chasers(y, x)
+        if not (0 <= y < self.height and 0 <= x < self.width): # Inlined check_inrange
+            return False
+        return not self.blocks[y * self.width + x].is_solid and not self.check_chasers(y, x)
 
     def check_player(self, y, x):
         """
@@ -176,7 +193,7 @@ class Maze(Sprite):
         Check whether a position is occupied by any chaser.
         """
         for chaser in self.chasers:
-            if (y, x) == (chaser.y, chaser.x):
+            if chaser.y == y and chaser.x == x:
                 return True
         return False
 
@@ -230,12 +247,75 @@ class Maze(Sprite):
         if self.check_bonus(y, x):
             self.blocks[index] = get_block("air")
 
+    def set_layer(self, layer: list[list[tuple[str, int]]], indices: frozenset[int]):
+        """
+        Sets the cached layer of static blocks used by the drawing.
+
+        Args:
+            layer:      list[list[tuple[str, int]]]
+                The cells snapshotted after the static blocks are drawn by draw_static.
+            indices:    frozenset[int]
+                The indices returned by draw_static.
+        """
+        self.layer = layer
+        self.layer_indices = indices
+
+    def get_visible_indices(self, win: "FrameBuffer"):
+        """
+        Get the indices of the cells which are visible through the camera of the window,
+        all cells are visible if the window has no camera.
+
+        Args:
+            win:    FrameBuffer
+                The buffer where the maze will be drawn.
+
+        Returns:
+            Iterable[int]
+                The indices of the visible cells in row-major order.
+        """
+        if win.camera is None:
+            return range(self.height * self.width)
+        top, left, bottom, right = win.camera.get_rect()
+        return (y * self.width + x for y in range(top, bottom) for x in range(left, right))
+
+    def draw_static(self, win: "FrameBuffer") -> frozenset[int]:
+        """
+        Draw the static blocks of the maze on the given window,
+        the boxes and bonuses are drawn as air since they can be moved or collected.
+
+        Args:
+            win:    FrameBuffer
+                The buffer where the static blocks will be drawn.
+
+        Returns:
+            frozenset[int]
+                The indices of the cells whose blocks are not drawn as they are.
+        """
+        air = get_block("air")
+        placements = []
+        indices = []
+        for index in self.get_visible_indices(win):
+            block = self.blocks.base[index]
+            if block in (get_block("box"), get_block("bonus")):
+                indices.append(index)
+                block = air
+            placements.append((block, *divmod(index, self.width)))
+        for block, y, x in placements:
+            block.draw(win, y, x)
+        return frozenset(indices)
+
     def draw(self):
         """
-        Draw the maze and its contents on the window.
+        Draw the maze and its contents on the window,
+        only the changeable cells are drawn on top of the layer if there is one.
         """
-        for index, block in enumerate(self.blocks):
-            y, x = divmod(index, self.width)
+        if self.layer is None:
+            placements = [(self.blocks[index], *divmod(index, self.width)) for index in self.get_visible_indices(self.win)]
+        else:
+            self.win.paste(self.layer)
+            indices = self.layer_indices.union(self.blocks.overlay)
+            placements = [(self.blocks[index], *divmod(index, self.width)) for index in indices]
+        for block, y, x in placements:
             block.draw(self.win, y, x)
 
 
@@ -262,7 +342,7 @@ class Player(MovableSprite):
             Draws the player at the coordinate on the window.
     """
     def __init__(
-        self, win: curses.window, height: int, width: int, 
+        self, win: "FrameBuffer", height: int, width: int, 
         blocks: list["Block"], maze: "Maze"
     ):
         super().__init__(win, height, width, blocks)
@@ -326,6 +406,85 @@ class Player(MovableSprite):
         block.draw(self.win, self.y, self.x)        
 
 
+class Route:
+    """
+    A class to hold the route of a chaser compactly as its start cell and the directions of its steps,
+    which is immutable and shared by all the chasers following it.
+    The chasers decode their next cells from their current ones by a single step,
+    while indexing a cell decodes the route from its start.
+
+    Attributes:
+        start:  tuple[int, int]
+            The first cell of the route.
+        path:   str
+            The directions of the steps between the cells, each of "u", "d", "l" and "r",
+            where the route goes back to its start after the last cell.
+
+    Methods:
+        from_cells(cells):
+            Encodes the route from its cells, if every step moves to a neighbouring cell.
+        to_data():
+            Get the route in the format of the JSON file of the mazes.
+    """
+    def __init__(self, start: tuple[int, int], path: str):
+        self.start: tuple[int, int] = start
+        self.path: str = path
+
+    def __len__(self) -> int:
+        return len(self.path) + 1
+
+    def __getitem__(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("route index out of range")
+        y, x = self.start
+        for direction in self.path[:index]:
+            dy, dx = directions[direction]
+            y, x = y + dy, x + dx
+        return y, x
+
+    def __iter__(self):
+        y, x = self.start
+        yield y, x
+        for direction in self.path:
+            dy, dx = directions[direction]
+            y, x = y + dy, x + dx
+            yield y, x
+
+    @staticmethod
+    def from_cells(cells: list[list[int]]) -> Optional["Route"]:
+        """
+        Encodes the route from its cells, if every step moves to a neighbouring cell.
+
+        Args:
+            cells:  list[list[int]]
+                The cells of the route as [y, x] pairs.
+
+        Returns:
+            Route or None
+                The encoded route, or None if any step does not move to a neighbouring cell.
+        """
+        codes = {delta: direction for direction, delta in directions.items()}
+        path = []
+        for (y, x), (ny, nx) in zip(cells, cells[1:]):
+            direction = codes.get((ny - y, nx - x))
+            if direction is None:
+                return None
+            path.append(direction)
+        return Route(tuple(cells[0]), "".join(path))
+
+    def to_data(self) -> dict[str, Any]:
+        """
+        Get the route in the format of the JSON file of the mazes.
+
+        Returns:
+            dict[str, Any]
+                The start cell as a [y, x] pair and the directions of the steps.
+        """
+        return {"start": list(self.start), "path": self.path}
+
+
 class Chaser(MovableSprite):
     """
     A movable sprite representing a chaser in the game.
@@ -333,17 +492,17 @@ class Chaser(MovableSprite):
     Attributes:
         maze:   Maze
             The maze object that the player is on.
-        route:  list[tuple[int, int]]
-            The route of the chaser.
+        route:  Route or list[tuple[int, int]]
+            The route of the chaser, whose cells are decoded lazily.
     
     Methods:
         draw():
             Draws the chaser at the coordinate on the window.
     """
     def __init__(
-        self, win: curses.window, height: int, width: int, 
+        self, win: "FrameBuffer", height: int, width: int, 
         blocks: list["Blocks"], maze: "Maze", 
-        route: list[tuple[int, int]]
+        route: "Route"
     ):
         super().__init__(win, height, width, blocks)
         self.maze = maze
@@ -360,9 +519,9 @@ class Chaser(MovableSprite):
 
 class AutoChaser(Chaser):
     def __init__(
-        self, win: curses.window, height: int, width: int, 
+        self, win: "FrameBuffer", height: int, width: int, 
         blocks: list["Blocks"], maze: "Maze", 
-        route: list[tuple[int, int]], player: "Player"
+        route: "Route", player: "Player"
     ):
         """
         A subclass of Chaser representing Chasers which can search the shortest path to player by algorithm.
@@ -384,6 +543,8 @@ class AutoChaser(Chaser):
     def search(self):
         """
         Searches for the shortest path towards the player with the A* algorithm.
+        The open nodes are kept in a heap ordered by their estimated cost and then their order of discovery,
+        and each node is discovered once, so ties are broken in the same order as a stable sort.
         
         Returns:
             list[tuple[int, int]]
@@ -392,15 +553,13 @@ class AutoChaser(Chaser):
         """
         start = self.y, self.x
         end = self.player.y, self.player.x
-        open_nodes = [start]
-        closed_nodes = []
-        prev_nodes = {start: None}
+        open_nodes = [(self.maze.get_distance(*start, *end), 0, start)]
+        prev_nodes = {start: None} # Discovered Nodes
         costs = {start: 0}
+        order = 0
 
         while open_nodes:
-            open_nodes.sort(key=lambda node: costs[node] + self.maze.get_distance(*node, *end))
-            open_node = open_nodes.pop(0)
-            closed_nodes.append(open_node)
+            _, _, open_node = heapq.heappop(open_nodes)
 
             # Path Found and Return
             if open_node == end:
@@ -412,13 +571,14 @@ class AutoChaser(Chaser):
                 path.reverse()
                 return path
             
+            cost = costs[open_node] + 1
             for neighbour_node in self.maze.get_neighbours(*open_node):
-                if neighbour_node not in closed_nodes and neighbour_node not in open_nodes:
-                    open_nodes.append(neighbour_node)
+                if neighbour_node not in prev_nodes:
                     prev_nodes[neighbour_node] = open_node
-                    cost = costs[open_node] + 1
-                    if neighbour_node not in costs or cost < costs[neighbour_node]:
-                        costs[neighbour_node] = cost
+                    costs[neighbour_node] = cost
+                    order += 1
+                    estimate = cost + self.maze.get_distance(*neighbour_node, *end)
+                    heapq.heappush(open_nodes, (estimate, order, neighbour_node))
             
         # No Path Found
         return []
@@ -450,38 +610,114 @@ class FixedChaser(Chaser):
             The number of steps the chaser has taken.
     
     Methods:
-        move():
-            Move the chaser to the next route if it is valid.
+        get_next():
+            Get the next cell of the route, which is moved to by the Patrols.
         draw():
             Draws the chaser and the next step at the coordinate on the window.
     """
     def __init__(
-        self, win: curses.window, height: int, width: int, 
+        self, win: "FrameBuffer", height: int, width: int, 
         blocks: list["Blocks"], maze: "Maze", 
-        route: list[tuple[int, int]]
+        route: "Route"
     ):
         super().__init__(win, height, width, blocks, maze, route)
         self.step = 1
 
-    def move(self):
+    def get_next(self) -> tuple[int, int]:
         """
-        Move the chaser to the next route if it is valid.
+        Get the next cell of the route.
+        The chaser always stands on the cell before its step, so the next cell of a Route
+        is decoded from the current cell by a single direction instead of from the start.
+
+        Returns:
+            tuple[int, int]
+                The cell which the chaser moves to next.
         """
-        ny, nx = self.route[self.step % len(self.route)]
-        if not self.maze.check_route(ny, nx):
-            return
-        
-        dy, dx = ny - self.y, nx - self.x
-        self.step += 1
-        super().move(dy, dx)
-    
+        index = self.step % len(self.route)
+        if index and isinstance(self.route, Route):
+            dy, dx = directions[self.route.path[index - 1]]
+            return self.y + dy, self.x + dx
+        return self.route[index]
+
     def draw(self):
         """
         Draws the chaser and the next step at the coordinate on the window.
         """
-        ny, nx = self.route[self.step % len(self.route)]
+        ny, nx = self.get_next()
         if self.maze.check_route(ny, nx) and not self.maze.check_player(ny, nx):
             block = self.blocks[1]
             block.draw(self.win, ny, nx)
         super().draw()
 
+
+class Patrols:
+    """
+    A class to move the chasers of a maze in one pass per turn,
+    where the fixed chasers walk their routes from their current cells one direction per move,
+    and the cells occupied by the chasers are counted in a table instead of being searched for each move.
+
+    Attributes:
+        routes:     list[Route or list[tuple[int, int]] or None]
+            The route of each chaser, None for the chasers which do not follow a fixed route.
+
+    Methods:
+        move(maze, chasers, indices):
+            Moves the chasers by the given indices in order.
+    """
+    def __init__(self, chasers: list["Chaser"]):
+        self.routes: list[Optional[Union["Route", list[tuple[int, int]]]]] = [
+            chaser.route if isinstance(chaser, FixedChaser) else None for chaser in chasers
+        ]
+
+    def move(self, maze: "Maze", chasers: list["Chaser"], indices: Iterable[int]) -> bool:
+        """
+        Moves the chasers by the given indices in order.
+        A fixed chaser moves to the next cell of its route unless it is solid or occupied by any chaser,
+        the other chasers move on their own, and the table of occupied cells follows every move,
+        so the chasers move as if each of them had moved after the previous one.
+
+        Args:
+            maze:       Maze
+                The maze which the chasers are in.
+            chasers:    list[Chaser]
+                The chasers in the maze, in the same order as they were packed.
+            indices:    Iterable[int]
+                The indices of the chasers to be moved.
+
+        Returns:
+            bool
+                True if any chaser moved, otherwise False.
+        """
+        height, width = maze.height, maze.width
+        routes = self.routes
+        layout = maze.blocks
+        occupied = {}
+        for chaser in chasers:
+            cell = chaser.y * width + chaser.x
+            occupied[cell] = occupied.get(cell, 0) + 1
+
+        moved = False
+        for index in indices:
+            chaser = chasers[index]
+            cell = chaser.y * width + chaser.x
+            if routes[index] is not None: # Fixed Chasers
+                y, x = chaser.get_next()
+                if not (0 <= y < height and 0 <= x < width):
+                    continue
+                target = y * width + x
+                if target in occupied or layout[target].is_solid:
+                    continue
+                chaser.y, chaser.x = y, x
+                chaser.step += 1
+            else:
+                chaser.move()
+                target = chaser.y * width + chaser.x
+                if target == cell:
+                    continue
+            if occupied[cell] == 1:
+                del occupied[cell]
+            else:
+                occupied[cell] -= 1
+            occupied[target] = occupied.get(target, 0) + 1
+            moved = True
+        return moved
@@ -1,5 +1,14 @@
 import json
+import random
 import sys
+import time
+
+import batch
+import blocks
+import display
+import engine
+import loaders
+import sprites
 
 def log_to_file(*msgs, sep=" ", end="\n"):
     """
@@ -42,6 +51,7 @@ def check_maze(maze):
     start = maze["start"]
     end = maze["end"]
     routes = maze.get("routes", {})
+    speeds = maze.get("speeds", {})
     blocks = maze["block_names"]
 
     if len(blocks) != height * width:
@@ -59,14 +69,44 @@ def check_maze(maze):
     if blocks[index] != "end":
         return False, "Block End Unconsistent", f"Get {blocks[index]} at {index} while expected end"
     
-    for route in routes.values():
-        for block in route:
-            index = block[0] * width + block[1]
+    for name, route in routes.items():
+        if isinstance(route, dict) and any(direction not in sprites.directions for direction in route["path"]):
+            return False, "Unknown Direction", f"Get path {route['path']} of {name} while expected one of {list(sprites.directions)}"
+        for y, x in loaders.MazeLoader.parse_route(route):
+            if not (0 <= y < height and 0 <= x < width):
+                return False, "Route Out of Range", f"Get {[y, x]} of {name} while expected within {height}x{width}"
+            index = y * width + x
             if blocks[index] != "air":
                 return False, "Route is Blocked", f"Get {blocks[index]} at {index} while expected air"
+
+    for name, speed in speeds.items():
+        if name not in routes:
+            return False, "Unknown Chaser", f"Get speed of {name} while expected one of {list(routes)}"
+        if speed not in engine.speeds:
+            return False, "Unknown Speed", f"Get speed {speed} of {name} while expected one of {list(engine.speeds)}"
     
     return True, None, None
 
+def encode_routes(path):
+    """
+    Encode the routes of the mazes in the file given by the path as start cells with the directions of the steps,
+    the routes which can not be encoded are kept as lists of cells.
+    """
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+    count = 0
+    for maze in data:
+        for name, route in maze.get("routes", {}).items():
+            route = loaders.MazeLoader.parse_route(route)
+            if isinstance(route, sprites.Route):
+                maze["routes"][name] = route.to_data()
+                count += 1
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.write("\n")
+    print(f"{count} Routes Encoded")
+
 def check_mazes(path):
     """
     Check the mazes in the file given by the path.
@@ -85,6 +125,110 @@ def check_mazes(path):
     if count == 0:
         print("All Mazes Pass the Checks")
 
+def benchmark_mazes(path, frames=500):
+    """
+    Benchmark the rendering of the mazes in the file given by the path headlessly,
+    the player moves randomly with a fixed seed and every frame is displayed.
+    """
+
+    loaders.BlockLoader("./assets/blocks.json").load()
+    maze_loader = loaders.MazeLoader(path)
+    maze_loader.load()
+    print("Maze  Frames  Calls/Frame  Saved/Frame  Bytes/Frame  us/Frame")
+    for index in range(maze_loader.get_maze_nums()):
+        maze_loader.set_index(index)
+        displayer = display.HeadlessDisplayer()
+        maze_height, maze_width = maze_loader.get_basics()
+        block_size = blocks.choose_block_size(maze_height, maze_width, *displayer.screen.getmaxyx())
+        displayer.create_win(maze_height, maze_width, block_size)
+        state = engine.create_state(maze_loader, displayer.buffer)
+        displayer.build_layer(state.maze)
+        displayer.display_game(state.get_sprites())
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        rng = random.Random(0)
+        calls, written = displayer.stats["calls"], displayer.stats["bytes"]
+        saved = displayer.buffer.stats["saved"]
+        start = time.perf_counter()
+        for _ in range(frames):
+            if state.check_win() or state.check_lose():
+                state = engine.create_state(maze_loader, displayer.buffer)
+                displayer.build_layer(state.maze)
+            state.step(*rng.choice(directions))
+            displayer.display_game(state.get_sprites())
+        elapsed = time.perf_counter() - start
+        calls = displayer.stats["calls"] - calls
+        written = displayer.stats["bytes"] - written
+        saved = displayer.buffer.stats["saved"] - saved
+        print(f"{index:4d}  {frames:6d}  {calls / frames:11.2f}  {saved / frames:11.2f}  {written / frames:11.2f}  {elapsed / frames * 1e6:8.1f}")
+
+def simulate_mazes(path, policy="random", games=1000):
+    """
+    Simulate the games of all the mazes in the file given by the path headlessly in batch,
+    the summary of a maze is printed once all its games have finished.
+    """
+
+    maze_loader = loaders.MazeLoader(path)
+    maze_loader.load()
+    maze_indices = list(range(maze_loader.get_maze_nums()))
+    seeds = list(range(games))
+    print("Maze  Games  WinRate  Step p10/p50/p90     Score p10/p50/p90")
+    start = time.perf_counter()
+    for maze_index, recorder in batch.run_batch(path, maze_indices, policy, seeds):
+        if len(recorder.records) < games:
+            continue
+        summary = batch.summarize_batch(recorder)
+        steps = "/".join(str(step) for step in summary["step_percentiles"].values())
+        scores = "/".join(str(score) for score in summary["score_percentiles"].values())
+        print(f"{maze_index:4d}  {summary['games']:5d}  {summary['win_rate']:7.2%}  {steps:18s}  {scores}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(maze_indices) * games} games in {elapsed:.2f}s")
+
+def replay_records(path):
+    """
+    Replay the games of the records in the file given by the path headlessly at full speed,
+    and verify that each replayed game ends with the recorded status, step and score,
+    also when it is sought to the end from its last keyframe, and passes through the recorded keyframes.
+    """
+
+    loaders.BlockLoader("./assets/blocks.json").load()
+    maze_loader = loaders.MazeLoader("./assets/mazes.json")
+    maze_loader.load()
+    recorder = display.Recorder()
+    recorder.load(path)
+    game_engine = engine.GameEngine(maze_loader)
+
+    def summarize(record):
+        """
+        Get the status, step and score of the record, or None if the game is unfinished.
+        """
+
+        return record and (record["status"], record["step"], record["score"])
+
+    count = inputs = 0
+    start = time.perf_counter()
+    for index, record in enumerate(recorder.records):
+        replayed = game_engine.replay(record)
+        inputs += len(game_engine.inputs)
+        keyframes = json.loads(json.dumps(game_engine.keyframes))
+        game_engine.seek(record, len(game_engine.inputs))
+        if summarize(game_engine.get_record()) != summarize(replayed):
+            print(f"Error occurs at Record {index}")
+            print("Seeking to the end does not match the replay")
+            count += 1
+        if summarize(replayed) != summarize(record):
+            print(f"Error occurs at Record {index}")
+            print(f"Expected: {summarize(record)}")
+            print(f"Replayed: {summarize(replayed) or 'unfinished'}")
+            count += 1
+        elif "keyframes" in record and keyframes != record["keyframes"]:
+            print(f"Error occurs at Record {index}")
+            print("The keyframes of the replay do not match the record")
+            count += 1
+    elapsed = time.perf_counter() - start
+    print(f"{len(recorder.records)} games with {inputs} inputs replayed in {elapsed:.3f}s")
+    if count == 0:
+        print("All Replays Match the Records")
+
 def print_helps():
     """
     Print the helps of the program.
@@ -94,6 +238,10 @@ def print_helps():
     print("Options: ")
     print("    -m <path>  Check the Mazes ")
     print("    -f <path>  Format the jsons")
+    print("    -e <path>  Encode the routes of the mazes compactly")
+    print("    -b <path>  Benchmark the rendering of the mazes")
+    print("    -s <path> [policy] [games]  Simulate the games of the mazes in batch (policy: random or greedy, games: 1000)")
+    print("    -r <path>  Replay the records and verify their scores")
     print("    -h         Display the help")
 
 def main(*args, **kwargs):
@@ -114,6 +262,28 @@ def main(*args, **kwargs):
     if args[1] == "-f":
         json_format(args[2])
         return
+    if args[1] == "-e":
+        encode_routes(args[2])
+        return
+    if args[1] == "-b":
+        benchmark_mazes(args[2])
+        return
+    if args[1] == "-r":
+        replay_records(args[2])
+        return
+    if args[1] == "-s":
+        policy = args[3] if len(args) > 3 else "random"
+        games = args[4] if len(args) > 4 else "1000"
+        if policy not in batch.policies:
+            print(f"Unknown policy {policy}")
+            print_helps()
+            return
+        if not games.isdigit() or int(games) < 1:
+            print("The number of games must be a positive integer")
+            print_helps()
+            return
+        simulate_mazes(args[2], policy, int(games))
+        return
     else:
         print("Unknown options")
         print_helps()
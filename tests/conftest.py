@@ -0,0 +1,9 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, "src"))
+
+import loaders
+
+loaders.BlockLoader(os.path.join(root, "assets", "blocks.json")).load()
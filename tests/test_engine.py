@@ -0,0 +1,28 @@
+import os
+
+import engine
+import loaders
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_game(y: int, x: int) -> "GameEngine":
+    """
+    Starts a real-time game of the first maze with the player moved to the given cell.
+    """
+    maze_loader = loaders.MazeLoader(os.path.join(root, "assets", "mazes.json"))
+    maze_loader.load()
+    game_engine = engine.GameEngine(maze_loader, tps=8)
+    state = game_engine.reset(0)
+    state.player.y, state.player.x = y, x
+    return game_engine
+
+def test_catchup_ticks_match_single_ticks():
+    # A chaser passes over the player within the batch of ticks
+    batched = start_game(5, 2)
+    batched.step("stay", 4)
+    single = start_game(5, 2)
+    for _ in range(4):
+        single.step("stay", 1)
+    assert single.status == "lose"
+    assert batched.status == single.status
+    assert batched.state.snapshot() == single.state.snapshot()